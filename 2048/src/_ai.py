@@ -0,0 +1,200 @@
+import collections
+import random
+
+from _engine import BitGrid
+
+__all__ = (
+    'RandomPlayer',
+    'GreedyPlayer',
+    'ExpectimaxPlayer',
+)
+
+
+class RandomPlayer:
+    """
+    Chooses a random move that changes the grid of size 4.
+    """
+
+    DIRECTIONS = ('up', 'down', 'left', 'right')
+
+    def __init__(self):
+        self._moves = (BitGrid.move_up, BitGrid.move_down, BitGrid.move_left, BitGrid.move_right)
+
+    def best_move(self, grid) -> str:
+        board = grid.board if isinstance(grid, BitGrid) else ExpectimaxPlayer.to_board(grid)
+        moves = [direction for direction, move in zip(self.DIRECTIONS, self._moves) if move(board)[0] != board]
+        return random.choice(moves) if moves else None
+
+
+class GreedyPlayer(RandomPlayer):
+    """
+    Chooses the move that gains the highest score, and then leaves the most empty cells.
+    """
+
+    def best_move(self, grid) -> str:
+        board = grid.board if isinstance(grid, BitGrid) else ExpectimaxPlayer.to_board(grid)
+
+        best, best_value = None, None
+        for direction, move in zip(self.DIRECTIONS, self._moves):
+            after, score = move(board)
+            if after == board:
+                continue
+            value = (score, BitGrid.empty_cells(after))
+            if best_value is None or value > best_value:
+                best, best_value = direction, value
+        return best
+
+
+class ExpectimaxPlayer:
+    """
+    Chooses moves for a grid of size 4 with expectimax search over bitboards.
+
+    Max nodes try every move, chance nodes average over every tile that can appear in every empty cell. Search stops
+    at the depth limit or when the probability of reaching a chance node falls below the cutoff, leaves are scored by
+    a heuristic that rewards empty cells, possible merges and rows and columns that are monotonic. Values of chance
+    nodes are kept in a transposition table with LRU eviction.
+    """
+
+    DIRECTIONS = ('up', 'down', 'left', 'right')
+
+    # heuristic weights, monotonicity and large tiles are penalised by powers of exponents
+    SUM_WEIGHT = 11.0
+    SUM_POWER = 3.5
+    EMPTY_WEIGHT = 270.0
+    MERGE_WEIGHT = 700.0
+    MONOTONICITY_WEIGHT = 47.0
+    MONOTONICITY_POWER = 4.0
+    LOST_PENALTY = 200000.0
+
+    # probability of every spawned tile exponent, Grid spawns 1 and 2 with equal chance
+    TILES = ((1, 0.5), (2, 0.5))
+
+    _heuristic = None
+
+    def __init__(self, depth: int = 3, probability: float = 1e-3, cache_size: int = 1 << 16):
+        """
+        :param depth: maximum number of moves to look ahead.
+        :param probability: chance nodes reached with lower probability are evaluated by the heuristic.
+        :param cache_size: maximum number of positions in the transposition table.
+        """
+
+        self.depth = depth
+        self.probability = probability
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._moves = (BitGrid.move_up, BitGrid.move_down, BitGrid.move_left, BitGrid.move_right)
+
+        if ExpectimaxPlayer._heuristic is None:
+            ExpectimaxPlayer._build_heuristic()
+
+    def best_move(self, grid) -> str:
+        """
+        Return the best move for the grid, one of `up`, `down`, `left` and `right`, or None if there is no move.
+
+        :param grid: Grid or BitGrid of size 4.
+        """
+
+        board = grid.board if isinstance(grid, BitGrid) else self.to_board(grid)
+
+        best, best_value = None, float('-inf')
+        for direction, move in zip(self.DIRECTIONS, self._moves):
+            after, _ = move(board)
+            if after == board:
+                continue
+            value = self._chance(after, self.depth - 1, 1.0)
+            if value > best_value:
+                best, best_value = direction, value
+        return best
+
+    @staticmethod
+    def to_board(grid) -> int:
+        """
+        Pack a grid of size 4 into the BitGrid board representation, tiles larger than 16384 are not supported.
+        """
+
+        if grid.size != 4:
+            raise ValueError('ExpectimaxPlayer supports only grid of size 4')
+
+        board = 0
+        for i in range(4):
+            for j in range(4):
+                exponent = grid[i, j].bit_length()
+                if exponent > 15:
+                    raise ValueError('BitGrid supports tiles up to 16384')
+                board |= exponent << 16 * i + 4 * j
+        return board
+
+    def evaluate(self, board: int) -> float:
+        """
+        Return the heuristic value of the board.
+        """
+
+        table = self._heuristic
+        columns = BitGrid.transpose(board)
+        return table[board & 0xffff] + table[board >> 16 & 0xffff] + table[board >> 32 & 0xffff] + \
+            table[board >> 48] + table[columns & 0xffff] + table[columns >> 16 & 0xffff] + \
+            table[columns >> 32 & 0xffff] + table[columns >> 48]
+
+    def _max(self, board: int, depth: int, probability: float) -> float:
+        best = None
+        for move in self._moves:
+            after, _ = move(board)
+            if after != board:
+                value = self._chance(after, depth - 1, probability)
+                if best is None or value > best:
+                    best = value
+        return 0.0 if best is None else best
+
+    def _chance(self, board: int, depth: int, probability: float) -> float:
+        if depth == 0 or probability < self.probability:
+            return self.evaluate(board)
+
+        key = (board, depth)
+        cache = self._cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        empty = [shift for shift in range(0, 64, 4) if not board >> shift & 0xf]
+        total = 0.0
+        for exponent, chance in self.TILES:
+            chance /= len(empty)
+            for shift in empty:
+                total += chance * self._max(board | exponent << shift, depth, probability * chance)
+
+        cache[key] = total
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return total
+
+    @classmethod
+    def _build_heuristic(cls):
+        table = [0.0] * 65536
+        for row in range(65536):
+            tiles = [row >> 4 * j & 0xf for j in range(4)]
+            empty = tiles.count(0)
+
+            merges, previous, counter = 0, 0, 0
+            for tile in tiles:
+                if tile == 0:
+                    continue
+                if tile == previous:
+                    counter += 1
+                elif counter > 0:
+                    merges += 1 + counter
+                    counter = 0
+                previous = tile
+            if counter > 0:
+                merges += 1 + counter
+
+            left = right = 0.0
+            for a, b in zip(tiles, tiles[1:]):
+                if a > b:
+                    left += a ** cls.MONOTONICITY_POWER - b ** cls.MONOTONICITY_POWER
+                else:
+                    right += b ** cls.MONOTONICITY_POWER - a ** cls.MONOTONICITY_POWER
+
+            # every row gets the lost penalty as a base, so any board is valued above a lost one
+            table[row] = cls.LOST_PENALTY + cls.EMPTY_WEIGHT * empty + cls.MERGE_WEIGHT * merges - \
+                cls.MONOTONICITY_WEIGHT * min(left, right) - cls.SUM_WEIGHT * sum(e ** cls.SUM_POWER for e in tiles)
+        cls._heuristic = table
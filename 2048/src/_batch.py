@@ -0,0 +1,122 @@
+import numpy as np
+
+__all__ = (
+    'GridBatch',
+)
+
+
+class GridBatch:
+    """
+    Many independent games played at once, every operation is vectorized across the games.
+
+    Boards are kept in uint8 numpy array of shape (games, size, size), every cell holds exponent e of its tile value
+    2 ** (e - 1), or 0 for an empty cell. Moves are applied by reordering every board so that the move goes to the left,
+    moving all rows of all boards together and reordering them back.
+    """
+
+    UP, DOWN, LEFT, RIGHT = range(4)
+
+    def __init__(self, games: int, size: int = 4, seed: int = None):
+        self.size = size
+        self.cells = np.zeros((games, size, size), dtype=np.uint8)
+        self.score = np.zeros(games, dtype=np.int64)
+        self.random = np.random.default_rng(seed)
+
+        # flat cell indices of the board reordered so that each direction becomes a move to the left
+        index = np.arange(size * size).reshape(size, size)
+        self._index = np.stack([index.T, index.T[:, ::-1], index, index[:, ::-1]]).reshape(4, size * size)
+
+        everyone = np.ones(games, dtype=bool)
+        for _ in range(2):
+            self._random_cell(everyone)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def up(self) -> np.ndarray:
+        return self.move(np.full(len(self), self.UP))
+
+    def down(self) -> np.ndarray:
+        return self.move(np.full(len(self), self.DOWN))
+
+    def left(self) -> np.ndarray:
+        return self.move(np.full(len(self), self.LEFT))
+
+    def right(self) -> np.ndarray:
+        return self.move(np.full(len(self), self.RIGHT))
+
+    def move(self, directions: np.ndarray) -> np.ndarray:
+        """
+        Move tiles of every game in its own direction and add a random tile to every game that has changed.
+
+        :param directions: int numpy array of shape (games,) with one of UP, DOWN, LEFT and RIGHT per game,
+            games with negative direction are not moved.
+        :return: bool numpy array of shape (games,), True for games that have changed.
+        """
+
+        games = np.flatnonzero(directions >= 0)
+        if games.size == 0:
+            return np.zeros(len(self), dtype=bool)
+        index = self._index[directions[games]]
+        flat = self.cells.reshape(len(self), self.size * self.size)
+
+        before = np.take_along_axis(flat[games], index, axis=1).reshape(-1, self.size)
+        after, score = self._compress(before)
+
+        modified = np.zeros(len(self), dtype=bool)
+        modified[games] = np.any((after != before).reshape(len(games), self.size * self.size), axis=1)
+        flat[games[:, np.newaxis], index] = after.reshape(len(games), self.size * self.size)
+        np.add.at(self.score, games, score.reshape(len(games), self.size).sum(axis=1))
+
+        self._random_cell(modified)
+        return modified
+
+    def has_available_move(self) -> np.ndarray:
+        """
+        Return bool numpy array of shape (games,), True for games that are not over.
+        """
+
+        cells = self.cells
+        return np.any(cells == 0, axis=(1, 2)) | \
+            np.any(cells[:, :, 1:] == cells[:, :, :-1], axis=(1, 2)) | \
+            np.any(cells[:, 1:] == cells[:, :-1], axis=(1, 2))
+
+    def values(self) -> np.ndarray:
+        """
+        Return int64 numpy array of shape (games, size, size) with tile values, 0 for empty cells.
+        """
+
+        return np.where(self.cells > 0, np.left_shift(1, self.cells.astype(np.int64) - 1), 0)
+
+    def max_tile(self) -> np.ndarray:
+        return np.left_shift(1, self.cells.max(axis=(1, 2)).astype(np.int64) - 1)
+
+    def _compress(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # move rows to the left, returns new rows and score of merges of every row
+        rows = self._pack(rows)
+        score = np.zeros(len(rows), dtype=np.int64)
+
+        merged = np.zeros(len(rows), dtype=bool)
+        for j in range(self.size - 1):
+            # a tile merged with the previous one cannot merge again
+            merge = (rows[:, j] == rows[:, j + 1]) & (rows[:, j] != 0) & ~merged
+            score[merge] += np.left_shift(1, rows[merge, j].astype(np.int64))
+            rows[merge, j] += 1
+            rows[merge, j + 1] = 0
+            merged = merge
+
+        return self._pack(rows), score
+
+    @staticmethod
+    def _pack(rows: np.ndarray) -> np.ndarray:
+        # move non-empty cells to the beginning of every row keeping their order
+        order = np.argsort(rows == 0, axis=1, kind='stable')
+        return np.take_along_axis(rows, order, axis=1)
+
+    def _random_cell(self, games: np.ndarray):
+        # uniform choice among empty cells, as the largest random key of every game
+        games = np.flatnonzero(games & np.any(self.cells == 0, axis=(1, 2)))
+        flat = self.cells.reshape(len(self), self.size * self.size)
+        keys = self.random.random((len(games), self.size * self.size))
+        keys[flat[games] != 0] = -1
+        flat[games, np.argmax(keys, axis=1)] = self.random.integers(1, 3, len(games), dtype=np.uint8)
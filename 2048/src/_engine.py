@@ -7,6 +7,17 @@ class Grid:
         self.score = 0
         self.size = size
         self._cells = [[0] * self.size for _ in range(self.size)]
+
+        # empty cells in a list for random choice and their positions in it for removal in constant time,
+        # and number of pairs of adjacent cells with the same tile, both kept up to date by __setitem__
+        self._empty = [(i, j) for i in range(self.size) for j in range(self.size)]
+        self._empty_index = {cell: n for n, cell in enumerate(self._empty)}
+        self._pairs = 0
+        self._neighbours = tuple(tuple(
+            tuple((y, x) for y, x in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1))
+                  if 0 <= y < self.size and 0 <= x < self.size)
+            for j in range(self.size)) for i in range(self.size))
+
         for _ in range(2):
             self._random_cell()
 
@@ -63,28 +74,184 @@ class Grid:
         self[index[row][self.size - 1]] = 0
 
     def _random_cell(self):
-        choice = random.choice(self._empty_cells())
+        choice = random.choice(self._empty)
         self[choice] = random.randint(1, 2)
 
-    def _empty_cells(self):
-        return [(i, j) for i in range(self.size) for j in range(self.size) if self[i, j] == 0]
-
     def __getitem__(self, item):
         i, j = item
         return self._cells[i][j]
 
     def __setitem__(self, key, value):
         i, j = key
-        self._cells[i][j] = value
+        cells = self._cells
+        previous = cells[i][j]
+        if previous == value:
+            return
+
+        neighbours = self._neighbours[i][j]
+        if previous:
+            self._pairs -= sum(cells[y][x] == previous for y, x in neighbours)
+        else:
+            n = self._empty_index.pop((i, j))
+            last = self._empty.pop()
+            if n < len(self._empty):
+                self._empty[n] = last
+                self._empty_index[last] = n
+
+        cells[i][j] = value
+        if value:
+            self._pairs += sum(cells[y][x] == value for y, x in neighbours)
+        else:
+            self._empty_index[(i, j)] = len(self._empty)
+            self._empty.append((i, j))
 
     def __repr__(self):
         return '\n'.join([str(self._cells[i]) for i in range(self.size)])
 
     def has_available_move(self):
-        if self._empty_cells():
-            return True
+        # a full grid can move only if it has two adjacent cells with the same tile
+        return len(self._empty) > 0 or self._pairs > 0
+
+
+class BitGrid:
+    """
+    Grid of size 4 packed into a 64-bit integer with the same interface as Grid.
+
+    Every cell takes 4 bits and holds exponent e of its tile value 2 ** (e - 1), or 0 for an empty cell. Row i is stored
+    in bits 16 * i to 16 * i + 15 and column j in its j-th nibble. A move looks up every row in precomputed tables of
+    all 65536 rows, vertical moves transpose the board first. The largest tile is 16384, such tiles do not merge.
+    """
+
+    size = 4
+
+    def __init__(self, size: int = 4):
+        if size != self.size:
+            raise ValueError('BitGrid supports only grid of size 4')
+
+        self.score = 0
+        self.board = 0
+        for _ in range(2):
+            self._random_cell()
+
+    def up(self):
+        self._do(*self.move_up(self.board))
+
+    def down(self):
+        self._do(*self.move_down(self.board))
+
+    def left(self):
+        self._do(*self.move_left(self.board))
+
+    def right(self):
+        self._do(*self.move_right(self.board))
+
+    def _do(self, board, score):
+        if board != self.board:
+            self.board = board
+            self.score += score
+            self._random_cell()
+
+    @classmethod
+    def move_left(cls, board: int) -> tuple[int, int]:
+        """
+        Move tiles of the board to the left.
+
+        :return: board after the move and the score gained by merges.
+        """
+
+        rows, scores = cls._row_left, cls._score_left
+        a, b, c, d = board & 0xffff, board >> 16 & 0xffff, board >> 32 & 0xffff, board >> 48
+        return rows[a] | rows[b] << 16 | rows[c] << 32 | rows[d] << 48, scores[a] + scores[b] + scores[c] + scores[d]
+
+    @classmethod
+    def move_right(cls, board: int) -> tuple[int, int]:
+        rows, scores = cls._row_right, cls._score_right
+        a, b, c, d = board & 0xffff, board >> 16 & 0xffff, board >> 32 & 0xffff, board >> 48
+        return rows[a] | rows[b] << 16 | rows[c] << 32 | rows[d] << 48, scores[a] + scores[b] + scores[c] + scores[d]
+
+    @classmethod
+    def move_up(cls, board: int) -> tuple[int, int]:
+        # rows of the transposed board are columns, tables spread them back into columns
+        columns, scores = cls._column_up, cls._score_left
+        board = cls.transpose(board)
+        a, b, c, d = board & 0xffff, board >> 16 & 0xffff, board >> 32 & 0xffff, board >> 48
+        return columns[a] | columns[b] << 4 | columns[c] << 8 | columns[d] << 12, \
+            scores[a] + scores[b] + scores[c] + scores[d]
+
+    @classmethod
+    def move_down(cls, board: int) -> tuple[int, int]:
+        columns, scores = cls._column_down, cls._score_right
+        board = cls.transpose(board)
+        a, b, c, d = board & 0xffff, board >> 16 & 0xffff, board >> 32 & 0xffff, board >> 48
+        return columns[a] | columns[b] << 4 | columns[c] << 8 | columns[d] << 12, \
+            scores[a] + scores[b] + scores[c] + scores[d]
+
+    @staticmethod
+    def transpose(board: int) -> int:
+        a = board & 0xf0f00f0ff0f00f0f | (board & 0x0000f0f00000f0f0) << 12 | (board & 0x0f0f00000f0f0000) >> 12
+        return a & 0xff00ff0000ff00ff | (a & 0x00ff00ff00000000) >> 24 | (a & 0x00000000ff00ff00) << 24
+
+    @staticmethod
+    def empty_cells(board: int) -> int:
+        """
+        Return the number of empty cells of the board.
+        """
+
+        # set the lowest bit of every nibble that is not zero
+        board |= board >> 2
+        board |= board >> 1
+        return 16 - (board & 0x1111111111111111).bit_count()
+
+    def _random_cell(self):
+        choice = random.choice([i for i in range(16) if not self.board >> 4 * i & 0xf])
+        self.board |= random.randint(1, 2) << 4 * choice
+
+    def __getitem__(self, item):
+        i, j = item
+        exponent = self.board >> 16 * i + 4 * j & 0xf
+        return 1 << exponent - 1 if exponent else 0
+
+    def __setitem__(self, key, value):
+        i, j = key
+        shift = 16 * i + 4 * j
+        self.board = self.board & ~(0xf << shift) | (value.bit_length() if value else 0) << shift
+
+    def __repr__(self):
+        return '\n'.join([str([self[i, j] for j in range(self.size)]) for i in range(self.size)])
+
+    def has_available_move(self):
+        return self.empty_cells(self.board) > 0 or \
+            self.move_left(self.board)[0] != self.board or self.move_up(self.board)[0] != self.board
+
+    @classmethod
+    def _build_tables(cls):
+        row_left, score_left = [0] * 65536, [0] * 65536
+        for row in range(65536):
+            tiles = [row >> 4 * j & 0xf for j in range(4) if row >> 4 * j & 0xf]
+            merged, score, j = [], 0, 0
+            while j < len(tiles):
+                if j + 1 < len(tiles) and tiles[j] == tiles[j + 1] and tiles[j] < 15:
+                    merged.append(tiles[j] + 1)
+                    score += 1 << tiles[j]
+                    j += 2
+                else:
+                    merged.append(tiles[j])
+                    j += 1
+            row_left[row] = sum(e << 4 * j for j, e in enumerate(merged))
+            score_left[row] = score
+
+        def reverse(row):
+            return (row & 0xf) << 12 | (row >> 4 & 0xf) << 8 | (row >> 8 & 0xf) << 4 | row >> 12
+
+        def spread(row):
+            return (row & 0xf) | (row >> 4 & 0xf) << 16 | (row >> 8 & 0xf) << 32 | (row >> 12) << 48
+
+        row_right = [reverse(row_left[reverse(row)]) for row in range(65536)]
+        cls._column_up = [spread(row) for row in row_left]
+        cls._column_down = [spread(row) for row in row_right]
+        cls._score_right = [score_left[reverse(row)] for row in range(65536)]
+        cls._row_left, cls._row_right, cls._score_left = row_left, row_right, score_left
 
-        def test(index):
-            return self._compress(index, dryrun=True)
 
-        return test(self._up_index) or test(self._down_index) or test(self._left_index) or test(self._right_index)
+# tables are built once on import, so class methods work without an instance
+BitGrid._build_tables()
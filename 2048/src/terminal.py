@@ -4,6 +4,7 @@ import functools
 import math
 from curses import wrapper
 
+from _ai import *
 from _engine import *
 
 
@@ -62,6 +63,17 @@ def main(args, stdscr: curses.window):
         curses.init_pair(*items)
 
     grid = TermGrid(size=args.size)
+    if args.autoplay:
+        player = ExpectimaxPlayer(depth=args.depth)
+        while grid.has_available_move():
+            # BitGrid does not merge tiles of 16384, so the player may find no move while the grid still has one
+            move = player.best_move(grid)
+            if move is None:
+                break
+            getattr(grid, move)()
+            grid.refresh()
+            curses.napms(args.delay)
+
     while grid.has_available_move():
         ch = stdscr.getch()
         if ch == curses.KEY_UP:
@@ -80,8 +92,14 @@ def main(args, stdscr: curses.window):
 def parse_args():
     parser = argparse.ArgumentParser(description='Command-line 2048 game.', add_help=False)
     parser.add_argument('-n', '--size', type=int, default=4, help='Size of game grid.')
+    parser.add_argument('-a', '--autoplay', action='store_true', help='Let expectimax AI play the game.')
+    parser.add_argument('-d', '--depth', type=int, default=3, help='Number of moves AI looks ahead.')
+    parser.add_argument('--delay', type=int, default=50, help='Delay between AI moves in milliseconds.')
     parser.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS, help='Display detailed help.')
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.autoplay and args.size != 4:
+        parser.error('autoplay supports only grid of size 4')
+    return args
 
 
 if __name__ == '__main__':
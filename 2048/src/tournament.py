@@ -0,0 +1,135 @@
+import argparse
+import collections
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+from _ai import *
+from _engine import *
+
+STRATEGIES = {
+    'random': RandomPlayer,
+    'greedy': GreedyPlayer,
+    'expectimax': ExpectimaxPlayer
+}
+
+
+class Statistics:
+    """
+    Running statistics of games played by one strategy.
+
+    Only a fixed size uniform sample of games is kept (reservoir sampling), percentiles are estimated from it, so memory
+    does not grow with the number of games.
+    """
+
+    FIELDS = ('score', 'moves', 'seconds')
+
+    def __init__(self, size: int = 10000, seed: int = None):
+        self.size = size
+        self.games = 0
+        self.total = dict.fromkeys(self.FIELDS, 0)
+        self.max_tiles = collections.Counter()
+        self._sample = []
+        self._random = random.Random(seed)
+
+    def add(self, result: dict):
+        self.games += 1
+        for field in self.FIELDS:
+            self.total[field] += result[field]
+        self.max_tiles[result['max_tile']] += 1
+
+        item = tuple(result[field] for field in self.FIELDS)
+        if len(self._sample) < self.size:
+            self._sample.append(item)
+        elif (i := self._random.randrange(self.games)) < self.size:
+            self._sample[i] = item
+
+    def summary(self, percentiles=(5, 25, 50, 75, 95, 99)) -> dict:
+        result = {'games': self.games}
+        for k, field in enumerate(self.FIELDS):
+            values = sorted(item[k] for item in self._sample)
+            result[field] = {
+                'mean': self.total[field] / self.games if self.games else None,
+                **{f'p{p}': values[min(len(values) - 1, len(values) * p // 100)] if values else None
+                   for p in percentiles}
+            }
+        result['max_tile'] = {tile: count / self.games for tile, count in sorted(self.max_tiles.items())}
+        return result
+
+
+def play(task: tuple) -> dict:
+    strategy, game, seed, depth = task
+    random.seed(seed)
+    player = ExpectimaxPlayer(depth=depth) if strategy == 'expectimax' else STRATEGIES[strategy]()
+
+    start = time.perf_counter()
+    grid = BitGrid()
+    moves = 0
+    while grid.has_available_move():
+        getattr(grid, player.best_move(grid))()
+        moves += 1
+
+    return {
+        'strategy': strategy,
+        'game': game,
+        'seed': seed,
+        'score': grid.score,
+        'max_tile': max(grid[i, j] for i in range(grid.size) for j in range(grid.size)),
+        'moves': moves,
+        'seconds': time.perf_counter() - start
+    }
+
+
+def tasks(args):
+    # every strategy plays the same seeds, so they are compared on the same games
+    for game in range(args.games):
+        for strategy in args.strategies:
+            yield strategy, game, args.seed + game, args.depth
+
+
+def main(args):
+    statistics = {strategy: Statistics(args.reservoir, args.seed) for strategy in args.strategies}
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+
+    start = reported = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for count, result in enumerate(pool.imap_unordered(play, tasks(args), chunksize=args.chunksize), 1):
+            output.write(json.dumps(result) + '\n')
+            statistics[result['strategy']].add(result)
+
+            if time.perf_counter() - reported >= args.report:
+                reported = time.perf_counter()
+                print(f'{count} games in {reported - start:.1f}s, ' + ', '.join(
+                    f'{strategy} median score {stats.summary()["score"]["p50"]}'
+                    for strategy, stats in statistics.items() if stats.games), file=sys.stderr)
+
+    if output is not sys.stdout:
+        output.close()
+
+    summary = {strategy: stats.summary() for strategy, stats in statistics.items()}
+    json.dump(summary, sys.stderr if args.output == '-' else sys.stdout, indent=2)
+    print(file=sys.stderr if args.output == '-' else sys.stdout)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Tournament of 2048 strategies.', add_help=False)
+    parser.add_argument('-s', '--strategies', nargs='+', choices=tuple(STRATEGIES), default=tuple(STRATEGIES),
+                        help='Strategies to compare.')
+    parser.add_argument('-g', '--games', type=int, default=100, help='Number of games played by every strategy.')
+    parser.add_argument('-w', '--workers', type=int, help='Number of processes, defaults to the number of CPUs.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the first game.')
+    parser.add_argument('-d', '--depth', type=int, default=2, help='Number of moves expectimax looks ahead.')
+    parser.add_argument('-o', '--output', default='results.jsonl',
+                        help='JSON lines file with result of every game, - for standard output.')
+    parser.add_argument('--reservoir', type=int, default=10000,
+                        help='Number of games sampled per strategy to estimate percentiles.')
+    parser.add_argument('--chunksize', type=int, default=4, help='Number of games sent to a process at once.')
+    parser.add_argument('--report', type=float, default=10, help='Interval of progress reports in seconds.')
+    parser.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS, help='Display detailed help.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main(parse_args())
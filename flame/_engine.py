@@ -0,0 +1,219 @@
+import concurrent.futures
+import os
+from typing import Sequence
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+__all__ = (
+    'FlameSimulation',
+    'FlameBatch',
+)
+
+
+class FlameSimulation:
+    """
+    Flame cellular automaton that runs without display and renders frames to numpy arrays.
+
+    Frame is split into row bands that are processed by a thread pool. When Numba is installed, the stencil and
+    palette lookup are fused into a single compiled pass, otherwise every band runs a sequence of NumPy operations.
+    """
+
+    def __init__(self, width: int, height: int, seed: int = None, threads: int = None, jit: bool = True):
+        self.width = width
+        self.height = height
+
+        self.palette = self.create_palette()
+        self.image = np.zeros((height, width), dtype=np.uint32)
+        self.random = np.random.default_rng(seed)
+        self.jit = jit and numba is not None
+
+        # ping-pong buffers with two halo columns on each side and a halo row at the bottom,
+        # halos hold the opposite edges of the frame, so shifts wrap around without copying the frame
+        self._buffers = [np.zeros((height + 1, width + 4), dtype=np.uint8) for _ in range(2)]
+        self._sum = np.zeros((height, width), dtype=np.uint16)
+        self._center = np.zeros((height, width), dtype=np.uint16)
+        self._noise = np.zeros(width, dtype=np.float64)
+        self._index = np.zeros((height, width), dtype=np.intp)
+
+        # buffer columns of the halos and the columns they are copied from
+        self._halos, self._sources = self._halo_columns(0, width)
+        self._halo = np.zeros((height, len(self._halos)), dtype=np.uint8)
+
+        threads = threads or os.cpu_count()
+        bounds = np.linspace(0, height, min(threads, height) + 1).astype(int)
+        self._bands = tuple(zip(bounds[:-1], bounds[1:]))
+        self._executor = None
+        if self.jit:
+            numba.set_num_threads(min(threads, numba.config.NUMBA_NUM_THREADS))
+        elif len(self._bands) > 1:
+            self._executor = concurrent.futures.ThreadPoolExecutor(threads)
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        Current frame as uint8 numpy array of shape (height, width) with flame intensity.
+        """
+
+        return self._buffers[0][:self.height, 2:self.width + 2]
+
+    def step(self, n: int = 1, render: bool = False):
+        """
+        Advance simulation by n frames.
+
+        :param n: number of frames.
+        :param render: render the last frame to the image in the same pass, see :meth:`render`.
+        """
+
+        h, w = self.height, self.width
+        for i in range(n):
+            src, dst = self._buffers
+
+            # seed the initial row with random values
+            self.random.random(out=self._noise)
+            np.multiply(self._noise, 255, out=self._noise)
+            np.copyto(src[h - 1, 2:w + 2], self._noise, casting='unsafe')
+
+            self._refresh_halos(src)
+            src[h] = src[0]
+
+            render_band = render and i == n - 1
+            if self.jit:
+                _fused_step(src, dst, self.palette, self.image, render_band)
+            elif self._executor is None:
+                self._step_band(src, dst, 0, h, render_band)
+            else:
+                for future in [self._executor.submit(self._step_band, src, dst, start, stop, render_band)
+                               for start, stop in self._bands]:
+                    future.result()
+
+            self._buffers.reverse()
+
+    def render(self) -> np.ndarray:
+        """
+        Convert current frame to image using flame palette. The image buffer is reused between calls.
+
+        :return: uint32 numpy array of shape (height, width) with pixels in RGB32 format (0xffRRGGBB).
+        """
+
+        np.copyto(self._index, self.data)
+        return np.take(self.palette, self._index, out=self.image, mode='clip')
+
+    def close(self):
+        """
+        Stop worker threads of the simulation.
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def _refresh_halos(self, src: np.ndarray):
+        np.take(src[:self.height], self._sources, axis=1, out=self._halo)
+        src[:self.height, self._halos] = self._halo
+
+    @staticmethod
+    def _halo_columns(offset: int, width: int) -> tuple[np.ndarray, np.ndarray]:
+        # sources wrap modulo the width, so flames narrower than the halos wrap around several times
+        halos = offset + np.array([0, 1, width + 2, width + 3])
+        sources = offset + 2 + np.array([-2, -1, width, width + 1]) % width
+        return halos, sources
+
+    def _step_band(self, src: np.ndarray, dst: np.ndarray, start: int, stop: int, render: bool):
+        # perform the operation
+        # x[i, j] = (x[i - 1, j] + x[i - 2, j] + x[i + 1, j] + x[i + 2, j] + x[i, j + 1] * 5) / 9
+        w = self.width
+        total, center, index = self._sum[start:stop], self._center[start:stop], self._index[start:stop]
+        np.add(src[start:stop, :w], src[start:stop, 1:w + 1], out=total, dtype=np.uint16)
+        np.add(total, src[start:stop, 3:w + 3], out=total)
+        np.add(total, src[start:stop, 4:], out=total)
+        np.multiply(src[start + 1:stop + 1, 2:w + 2], 5, out=center, dtype=np.uint16)
+        np.add(total, center, out=total)
+
+        if render:
+            np.floor_divide(total, 9, out=index, casting='unsafe')
+            np.copyto(dst[start:stop, 2:w + 2], index, casting='unsafe')
+            np.take(self.palette, index, out=self.image[start:stop], mode='clip')
+        else:
+            np.floor_divide(total, 9, out=dst[start:stop, 2:w + 2], casting='unsafe')
+
+    @staticmethod
+    def create_palette() -> np.ndarray:
+        i = np.arange(64, dtype=np.uint32) * 4
+        red = np.concatenate((i, np.full(192, 255, dtype=np.uint32)))
+        green = np.concatenate((np.zeros(64, dtype=np.uint32), i, np.full(128, 255, dtype=np.uint32)))
+        blue = np.concatenate((np.zeros(128, dtype=np.uint32), i, np.full(64, 255, dtype=np.uint32)))
+        return 0xff000000 | red << 16 | green << 8 | blue
+
+
+class FlameBatch(FlameSimulation):
+    """
+    Several independent flames of the same height simulated as one frame.
+
+    Flames are laid side by side in a single buffer, each one surrounded by its own halo columns, so one stencil pass
+    and one palette lookup update all of them, and the cost depends on the total number of pixels only. In the frame
+    and the image, flames are separated by four blank columns.
+    """
+
+    GAP = 4
+
+    def __init__(self, widths: Sequence[int], height: int, seed: int = None, threads: int = None, jit: bool = True):
+        self.widths = tuple(widths)
+        self.offsets = tuple(np.cumsum((0,) + self.widths[:-1]) + np.arange(len(self.widths)) * self.GAP)
+        super().__init__(sum(self.widths) + self.GAP * (len(self.widths) - 1), height, seed, threads, jit)
+
+        # halos of every flame wrap around that flame only
+        columns = [self._halo_columns(o, w) for o, w in zip(self.offsets, self.widths)]
+        self._halos = np.concatenate([halos for halos, _ in columns])
+        self._sources = np.concatenate([sources for _, sources in columns])
+        self._halo = np.zeros((height, len(self._halos)), dtype=np.uint8)
+        # frame columns between flames
+        self._gaps = np.array([o + w + i for o, w in zip(self.offsets[:-1], self.widths) for i in range(self.GAP)],
+                              dtype=np.intp)
+
+    @property
+    def frames(self) -> Sequence[np.ndarray]:
+        """
+        Current frame of every flame as uint8 numpy array of shape (height, width) with flame intensity. When all
+        flames have the same width, it is a single view of shape (flames, height, width).
+        """
+
+        return self._split(self.data)
+
+    @property
+    def images(self) -> Sequence[np.ndarray]:
+        """
+        Image of every flame, see :attr:`frames` and :meth:`render`.
+        """
+
+        return self._split(self.image)
+
+    def step(self, n: int = 1, render: bool = False):
+        super().step(n, render)
+        # values between flames are computed from unrelated halos, blank them out
+        self.data[:, self._gaps] = 0
+        if render:
+            self.image[:, self._gaps] = self.palette[0]
+
+    def _split(self, array: np.ndarray) -> Sequence[np.ndarray]:
+        if len(set(self.widths)) == 1:
+            f, w = len(self.widths), self.widths[0]
+            return np.lib.stride_tricks.as_strided(
+                array, (f, self.height, w), ((w + self.GAP) * array.strides[1],) + array.strides, writeable=False)
+        return tuple(array[:, o:o + w] for o, w in zip(self.offsets, self.widths))
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _fused_step(src, dst, palette, image, render):
+        h, w = image.shape
+        for i in numba.prange(h):
+            for j in range(w):
+                value = (np.uint16(src[i, j]) + src[i, j + 1] + src[i, j + 3] + src[i, j + 4]
+                         + np.uint16(src[i + 1, j + 2]) * 5) // 9
+                dst[i, j + 2] = value
+                if render:
+                    image[i, j] = palette[value]
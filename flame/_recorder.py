@@ -0,0 +1,132 @@
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+try:
+    from PIL import GifImagePlugin, Image
+except ImportError:
+    Image = None
+
+__all__ = (
+    'FrameRecorder',
+)
+
+
+class FrameRecorder:
+    """
+    Writes flame frames to disk from a background thread.
+
+    Frames are passed through a bounded pool of buffers, so a slow disk blocks the simulation instead of piling frames up
+    in memory. Output format depends on the file extension: `.npy` and `.raw` are memory-mapped arrays of RGB frames
+    of shape (frames, height, width, 3), `.gif` is an animated GIF written frame by frame and requires Pillow.
+    """
+
+    FORMATS = ('.npy', '.raw', '.gif')
+
+    def __init__(self, path: str, frames: int, width: int, height: int, palette: np.ndarray, fps: int = 30,
+                 depth: int = 8):
+        self.path = path
+        self.frames = frames
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.format = os.path.splitext(path)[1].lower()
+        if self.format not in self.FORMATS:
+            raise ValueError(f'unsupported output format, expected one of {", ".join(self.FORMATS)}')
+        if self.format == '.gif' and Image is None:
+            raise ValueError('GIF output requires Pillow')
+
+        # palette holds RGB32 pixels (0xffRRGGBB)
+        self.palette = (palette[:, np.newaxis] >> np.array([16, 8, 0], dtype=np.uint32) & 0xff).astype(np.uint8)
+
+        self._free = queue.Queue()
+        for _ in range(depth):
+            self._free.put(np.zeros((height, width), dtype=np.uint8))
+        self._full = queue.Queue()
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, data: np.ndarray):
+        """
+        Queue a frame, blocks while all buffers are waiting to be written.
+
+        :param data: uint8 numpy array of shape (height, width) with flame intensity.
+        """
+
+        if self._error is not None:
+            raise self._error
+        buffer = self._free.get()
+        np.copyto(buffer, data)
+        self._full.put(buffer)
+
+    def close(self):
+        """
+        Wait until all queued frames are written and close the output.
+        """
+
+        if self._thread.is_alive():
+            self._full.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _frames(self):
+        while (buffer := self._full.get()) is not None:
+            yield buffer
+            self._free.put(buffer)
+        self._closed = True
+
+    def _run(self):
+        try:
+            if self.format == '.gif':
+                self._write_gif()
+            else:
+                self._write_array()
+        except Exception as e:
+            self._error = e
+            # keep releasing buffers, so the producer is not blocked until it sees the error
+            if not self._closed:
+                for _ in self._frames():
+                    pass
+
+    def _write_array(self):
+        shape = (self.frames, self.height, self.width, 3)
+        if self.format == '.npy':
+            output = np.lib.format.open_memmap(self.path, mode='w+', dtype=np.uint8, shape=shape)
+        else:
+            output = np.memmap(self.path, mode='w+', dtype=np.uint8, shape=shape)
+
+        count = 0
+        for data in self._frames():
+            if count == self.frames:
+                raise ValueError(f'expected {self.frames} frames, got more')
+            np.take(self.palette, data, axis=0, out=output[count])
+            count += 1
+        output.flush()
+
+    def _write_gif(self):
+        # Pillow's save(append_images=...) keeps all frames in memory until the end, so the file is written here frame
+        # by frame, and Pillow only encodes image data of every frame
+        # GIF stores delays in hundredths of a second and viewers slow down anything shorter than 20 ms
+        duration = max(2, round(100 / self.fps)) * 10
+        with open(self.path, 'wb') as file:
+            # header with the flame palette as 256 colors global color table, and application extension to loop forever
+            file.write(b'GIF89a' + struct.pack('<HHBBB', self.width, self.height, 0xf7, 0, 0) + self.palette.tobytes())
+            file.write(b'!\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', 0) + b'\x00')
+
+            for data in self._frames():
+                image = Image.frombytes('P', (self.width, self.height), data.tobytes())
+                for chunk in GifImagePlugin.getdata(image, duration=duration):
+                    file.write(chunk)
+            file.write(b';')
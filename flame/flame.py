@@ -1,69 +1,197 @@
+import argparse
+import collections
 import sys
+import time
+from typing import Sequence, Union
 
 import numpy as np
-from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QPixmap, QPainter, QColor, QImage
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QPainter, QImage
 from PyQt5.QtWidgets import QApplication, QWidget
 
+from _engine import *
+from _recorder import *
+
+
+class FrameStats:
+    """
+    Keeps timings of the most recent frames and reports their percentiles.
+    """
+
+    PHASES = ('sim', 'palette', 'blit')
+
+    def __init__(self, size: int = 300):
+        self.times = {phase: collections.deque(maxlen=size) for phase in self.PHASES}
+        self.frames = collections.deque(maxlen=size)
+        self.skipped = 0
+
+    def add(self, phase: str, seconds: float):
+        self.times[phase].append(seconds)
+
+    def frame(self, timestamp: float):
+        self.frames.append(timestamp)
+
+    @property
+    def fps(self) -> float:
+        if len(self.frames) < 2 or self.frames[-1] == self.frames[0]:
+            return 0.0
+        return (len(self.frames) - 1) / (self.frames[-1] - self.frames[0])
+
+    def summary(self, percentiles=(50, 95, 99)) -> str:
+        lines = [f'{self.fps:.1f} fps, {self.skipped} skipped, p{"/p".join(map(str, percentiles))} ms']
+        for phase, times in self.times.items():
+            if times:
+                values = np.percentile(times, percentiles) * 1000
+                lines.append(f'{phase:<8}' + ' '.join(f'{value:6.2f}' for value in values))
+        return '\n'.join(lines)
+
 
 class FlameWidget(QWidget):
     """
     A widget that displays a flame animation.
+
+    The simulation advances once per frame period of the target frame rate. When it falls more than a frame behind,
+    frames are simulated without being rendered until it catches up, so the flame keeps its speed on large windows.
     """
 
-    def __init__(self, width: int, height: int):
+    MAX_LAG = 4
+
+    def __init__(self, width: Union[int, Sequence[int]], height: int, threads: int = None, jit: bool = True,
+                 fps: int = 60, stats: bool = False):
         super().__init__()
-        self.width = width
+        # several widths display independent flames side by side, simulated as one batch
+        self.simulation = create_simulation(width, height, threads, jit)
+        self.width = self.simulation.width
         self.height = height
 
-        self.pixmap = QPixmap(width, height)
-        self.setFixedSize(width, height)
+        self.setFixedSize(self.width, height)
+
+        # image wraps the simulation image buffer, so rendering a frame updates it without copying
+        self.image = QImage(self.simulation.image.data, self.width, height, self.width * 4, QImage.Format_RGB32)
 
-        self.palette = self.create_palette()
-        self.data = np.zeros((height, width), dtype=np.uint8)
+        self.period = 1 / fps
+        self.deadline = self.logged = time.perf_counter()
+        self.stats = FrameStats() if stats else None
 
         self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.refresh)
-        self.timer.start(10)
+        self.timer.start(0)
 
     def paintEvent(self, event):
+        start = time.perf_counter()
         painter = QPainter(self)
-        painter.drawPixmap(0, 0, self.pixmap)
-
-    def refresh(self):
-        # seed the initial row with random values
-        self.data[self.height - 1, :] = np.random.randint(0, 255, self.width, dtype=np.uint8)
+        painter.drawImage(0, 0, self.image)
+        if self.stats is None:
+            return
 
-        # perform the operation
-        # x[i, j] = (x[i - 1, j] + x[i - 2, j] + x[i + 1, j] + x[i + 2, j] + x[i, j + 1] * 5) / 9
-        x1 = np.roll(self.data, shift=1, axis=1)
-        x2 = np.roll(self.data, shift=2, axis=1)
-        x3 = np.roll(self.data, shift=-1, axis=1)
-        x4 = np.roll(self.data, shift=-2, axis=1)
-        x5 = np.roll(self.data, shift=-1, axis=0)
+        self.stats.add('blit', time.perf_counter() - start)
+        self.stats.frame(start)
+        painter.setPen(Qt.white)
+        painter.drawText(self.rect().adjusted(4, 4, -4, -4), Qt.AlignLeft | Qt.AlignTop, self.stats.summary())
 
-        self.data = ((x1 + x2 + x3 + x4 + x5 * 5) // 9).astype(int)
-
-        # convert data to image using flame palette
-        image = QImage(self.palette[self.data], self.data.shape[1], self.data.shape[0], QImage.Format_RGB32)
-        self.pixmap.convertFromImage(image)
-
-        self.update()
-
-    @staticmethod
-    def create_palette():
-        palette = np.zeros((256,), dtype=np.uint32)
-        for i in range(64):
-            palette[i] = QColor(i * 4, 0, 0, 255).rgba()
-            palette[i + 64] = QColor(255, i * 4, 0, 255).rgba()
-            palette[i + 128] = QColor(255, 255, i * 4, 255).rgba()
-            palette[i + 192] = QColor(255, 255, 255, 255).rgba()
-        return palette
+    def refresh(self):
+        now = time.perf_counter()
+        render = now - self.deadline < self.period
+        if now - self.deadline > self.period * self.MAX_LAG:
+            # too far behind to catch up, drop the backlog
+            self.deadline = now
+
+        if self.stats is None:
+            self.simulation.step(render=render)
+        else:
+            # phases are timed separately, so the fused render of the Numba kernel is not used
+            self.simulation.step()
+            start = time.perf_counter()
+            self.stats.add('sim', start - now)
+            if render:
+                self.simulation.render()
+                self.stats.add('palette', time.perf_counter() - start)
+            else:
+                self.stats.skipped += 1
+            if now - self.logged >= 1:
+                self.logged = now
+                print(self.stats.summary().replace('\n', ' | '), file=sys.stderr)
+
+        if render:
+            self.update()
+        self.deadline += self.period
+        self.timer.start(max(0, round((self.deadline - time.perf_counter()) * 1000)))
+
+
+def create_simulation(width: Union[int, Sequence[int]], height: int, threads: int = None,
+                      jit: bool = True) -> FlameSimulation:
+    if isinstance(width, int):
+        return FlameSimulation(width, height, threads=threads, jit=jit)
+    if len(width) == 1:
+        return FlameSimulation(width[0], height, threads=threads, jit=jit)
+    return FlameBatch(width, height, threads=threads, jit=jit)
+
+
+def benchmark(args):
+    simulation = create_simulation(args.width, args.height, args.threads, not args.no_jit)
+    simulation.step(render=True)
+
+    start = time.perf_counter()
+    for _ in range(args.benchmark):
+        simulation.step(render=True)
+    elapsed = time.perf_counter() - start
+    simulation.close()
+
+    print(f'{args.benchmark} frames of {simulation.width}x{simulation.height} in {elapsed:.3f}s, '
+          f'{elapsed / args.benchmark * 1000:.3f} ms/frame, {args.benchmark / elapsed:.1f} fps')
+
+
+def record(args):
+    simulation = create_simulation(args.width, args.height, args.threads, not args.no_jit)
+    simulation.step(args.warmup)
+
+    start = time.perf_counter()
+    with FrameRecorder(args.out, args.render, simulation.width, simulation.height, simulation.palette,
+                       args.fps) as recorder:
+        for _ in range(args.render):
+            simulation.step()
+            recorder.write(simulation.data)
+    elapsed = time.perf_counter() - start
+    simulation.close()
+
+    print(f'{args.render} frames of {simulation.width}x{simulation.height} written to {args.out} in {elapsed:.3f}s, '
+          f'{args.render / elapsed:.1f} fps')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Flame animation.', add_help=False)
+    parser.add_argument('-W', '--width', type=int, nargs='+', default=(640,),
+                        help='Width of flame, several widths display independent flames side by side.')
+    parser.add_argument('-H', '--height', type=int, default=240, help='Height of flame.')
+    parser.add_argument('-t', '--threads', type=int, help='Number of threads, defaults to the number of CPUs.')
+    parser.add_argument('--no-jit', action='store_true', help='Do not use Numba even if it is installed.')
+    parser.add_argument('-b', '--benchmark', type=int, metavar='FRAMES',
+                        help='Simulate the given number of frames without display and print frame time.')
+    parser.add_argument('-r', '--render', type=int, metavar='FRAMES',
+                        help='Render the given number of frames to the output file without display.')
+    parser.add_argument('-o', '--out', default='frames.npy',
+                        help='Output file for rendered frames, one of .npy, .raw (RGB24) or .gif.')
+    parser.add_argument('--warmup', type=int, default=0, help='Number of frames to skip before rendering.')
+    parser.add_argument('--fps', type=int, default=60, help='Target frame rate of animation and rendered GIF.')
+    parser.add_argument('-s', '--stats', action='store_true',
+                        help='Show frame time percentiles and achieved frame rate, and log them every second.')
+    parser.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS, help='Display detailed help.')
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
+    args = parse_args()
+    if args.benchmark:
+        benchmark(args)
+        sys.exit()
+    if args.render:
+        record(args)
+        sys.exit()
+
     app = QApplication(sys.argv)
-    widget = FlameWidget(640, 240)
+    widget = FlameWidget(args.width, args.height, args.threads, not args.no_jit, args.fps, args.stats)
     widget.show()
 
     sys.exit(app.exec_())
@@ -0,0 +1,205 @@
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from hamming_code import HammingCode, DOUBLE_ERROR, encode, decode, encode_batch, decode_batch, encode_packed, \
+    decode_packed, encode_interleaved, decode_interleaved
+
+
+def measure(fn, repeat: int, setup=tuple) -> float:
+    """
+    Return the best wall time of fn over repeat runs, setup returns fn arguments and is not timed.
+    """
+
+    best = float('inf')
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def inject_errors(code: np.ndarray, rate: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Flip a single random bit in the given fraction of codewords, one codeword per row.
+    """
+
+    code = code.copy()
+    rows = np.flatnonzero(rng.random(len(code)) < rate)
+    code[rows, rng.integers(0, code.shape[1], len(rows))] ^= 1
+    return code
+
+
+def bench_scalar(k: int, blocks: int, rate: float, repeat: int, rng: np.random.Generator) -> tuple[float, float]:
+    data = rng.integers(0, 2, (blocks, k), dtype=np.int8)
+    code = inject_errors(encode_batch(data), rate, rng)
+
+    def encode_all():
+        for row in data:
+            encode(row)
+
+    def decode_all(rows):
+        for row in rows:
+            decode(row)
+
+    return measure(encode_all, repeat), measure(decode_all, repeat, lambda: (code.copy(),))
+
+
+def bench_batch(k: int, blocks: int, rate: float, repeat: int, rng: np.random.Generator) -> tuple[float, float]:
+    data = rng.integers(0, 2, (blocks, k), dtype=np.int8)
+    code = inject_errors(encode_batch(data), rate, rng)
+
+    return measure(lambda: encode_batch(data), repeat), measure(lambda: decode_batch(code), repeat)
+
+
+def bench_packed(k: int, blocks: int, rate: float, repeat: int, rng: np.random.Generator) -> tuple[float, float]:
+    data = rng.integers(0, 256, blocks * k // 8, dtype=np.uint8)
+    code = encode_packed(data, k)
+    errors = inject_errors(np.zeros((blocks, HammingCode.of(k).n), dtype=np.int8), rate, rng)
+    code ^= np.packbits(errors, axis=1)
+
+    return measure(lambda: encode_packed(data, k), repeat), measure(lambda: decode_packed(code, k), repeat)
+
+
+def bench_interleaved(k: int, blocks: int, depth: int, repeat: int, rng: np.random.Generator) -> tuple[float, float]:
+    data = rng.integers(0, 2, (blocks, k), dtype=np.int8)
+    frames = encode_interleaved(data, depth)
+
+    return measure(lambda: encode_interleaved(data, depth), repeat), \
+        measure(lambda: decode_interleaved(frames, depth), repeat)
+
+
+def burst_limits(k: int, blocks: int, depth: int, rng: np.random.Generator) -> tuple[int, int]:
+    """
+    Return the longest burst length that is always corrected and the longest one that is always corrected or
+    detected, one burst at a random offset is injected into every frame.
+    """
+
+    data = rng.integers(0, 2, (blocks, k), dtype=np.int8)
+    frames = encode_interleaved(data, depth)
+    offsets = np.arange(frames.shape[1])
+
+    corrected = detected = 0
+    for length in range(1, frames.shape[1] + 1):
+        start = rng.integers(0, frames.shape[1] - length + 1, len(frames))
+        burst = (offsets >= start[:, np.newaxis]) & (offsets < start[:, np.newaxis] + length)
+        errors, decoded = decode_interleaved(frames ^ burst, depth)
+
+        valid = np.all(decoded == data, axis=1)
+        if corrected == length - 1 and np.all(valid):
+            corrected = length
+        if not np.all(valid | (errors == DOUBLE_ERROR)):
+            break
+        detected = length
+
+    return corrected, detected
+
+
+PATHS = {
+    'scalar': bench_scalar,
+    'batch': bench_batch,
+    'packed': bench_packed
+}
+
+
+def throughput(k: int, blocks: int, seconds: float) -> dict:
+    return {
+        'seconds': seconds,
+        'blocks_per_s': blocks / seconds,
+        'mb_per_s': blocks * k / 8 / seconds / 1e6
+    }
+
+
+def main(args):
+    rng = np.random.default_rng(args.seed)
+
+    results = []
+    for path in args.paths:
+        for k in args.block_sizes:
+            if path == 'packed' and k % 8 != 0:
+                continue
+            # build the cached layout outside of timed runs
+            HammingCode.of(k)
+
+            for blocks in args.batch_sizes:
+                blocks = min(blocks, args.scalar_blocks) if path == 'scalar' else blocks
+                for rate in args.error_rates:
+                    encode_seconds, decode_seconds = PATHS[path](k, blocks, rate, args.repeat, rng)
+                    results.append({
+                        'path': path,
+                        'k': k,
+                        'n': HammingCode.of(k).n,
+                        'blocks': blocks,
+                        'error_rate': rate,
+                        'encode': throughput(k, blocks, encode_seconds),
+                        'decode': throughput(k, blocks, decode_seconds)
+                    })
+                    print(f'{path:>6} k={k:<5} blocks={blocks:<7} errors={rate:<5} '
+                          f'encode {results[-1]["encode"]["mb_per_s"]:10.3f} MB/s '
+                          f'decode {results[-1]["decode"]["mb_per_s"]:10.3f} MB/s', file=sys.stderr)
+
+    interleaved = []
+    for k in args.block_sizes:
+        for depth in args.depths:
+            blocks = max(args.batch_sizes) // depth * depth
+            encode_seconds, decode_seconds = bench_interleaved(k, blocks, depth, args.repeat, rng)
+            corrected, detected = burst_limits(k, blocks, depth, rng)
+            interleaved.append({
+                'k': k,
+                'n': HammingCode.of(k).n,
+                'depth': depth,
+                'blocks': blocks,
+                'corrected_burst': corrected,
+                'detected_burst': detected,
+                'encode': throughput(k, blocks, encode_seconds),
+                'decode': throughput(k, blocks, decode_seconds)
+            })
+            print(f'interleaved k={k:<5} depth={depth:<4} bursts corrected={corrected:<4} detected={detected:<4} '
+                  f'encode {interleaved[-1]["encode"]["mb_per_s"]:10.3f} MB/s '
+                  f'decode {interleaved[-1]["decode"]["mb_per_s"]:10.3f} MB/s', file=sys.stderr)
+
+    report = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'results': results,
+        'interleaved': interleaved
+    }
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark Hamming code throughput.', add_help=False)
+    parser.add_argument('-p', '--paths', nargs='+', choices=tuple(PATHS), default=tuple(PATHS),
+                        help='Code paths to benchmark.')
+    parser.add_argument('-k', '--block-sizes', nargs='+', type=int, default=(8, 64, 256, 4096),
+                        help='Number of data bits per block.')
+    parser.add_argument('-b', '--batch-sizes', nargs='+', type=int, default=(1024, 16384),
+                        help='Number of blocks processed per call.')
+    parser.add_argument('-e', '--error-rates', nargs='+', type=float, default=(0.0, 0.01, 0.1),
+                        help='Fraction of blocks with a single bit error.')
+    parser.add_argument('-d', '--depths', nargs='*', type=int, default=(1, 4, 16, 64),
+                        help='Interleaving depths, burst errors are benchmarked for each of them.')
+    parser.add_argument('--scalar-blocks', type=int, default=1000, help='Maximum number of blocks for scalar path.')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of runs, the best one is reported.')
+    parser.add_argument('-s', '--seed', type=int, default=42, help='Random seed.')
+    parser.add_argument('-o', '--output', default='-', help='JSON report file, - for standard output.')
+    parser.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS, help='Display detailed help.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main(parse_args())
@@ -1,5 +1,295 @@
+import argparse
+import concurrent.futures
+import contextlib
+import functools
+import itertools
+import os
+import sys
+import threading
+import typing
+from multiprocessing import shared_memory
+
 import numpy as np
 
+DOUBLE_ERROR = -2
+
+
+class LinearCode:
+    """
+    Binary linear code with single error correction and double error detection for data blocks of fixed length.
+
+    The code is defined by its generator and parity-check matrices. Decoding computes the syndrome with a single matrix
+    product and maps it to the error position with a precomputed lookup table. The layout is computed once per instance,
+    prefer :meth:`HammingCode.of` and :meth:`HsiaoCode.of` that cache instances by data length.
+    """
+
+    def __init__(self, generator: np.ndarray, parity_check: np.ndarray, data_index: np.ndarray):
+        self.k, self.n = generator.shape
+        self.generator = generator
+        self.parity_check = parity_check
+        self.data_index = data_index
+        self.check_index = np.setdiff1d(np.arange(self.n), data_index)
+
+        # maps syndrome to the position of a single error
+        self._weights = 1 << np.arange(len(parity_check))
+        self.syndromes = np.full(2 ** len(parity_check), DOUBLE_ERROR, dtype=np.int64)
+        self.syndromes[self._weights @ self.parity_check] = np.arange(self.n)
+        self.syndromes[0] = -1
+
+        self._parity_check_t = np.ascontiguousarray(parity_check.T)
+        self._local = threading.local()
+
+        self._data_column = np.full(self.n, -1)
+        self._data_column[self.data_index] = np.arange(self.k)
+
+        # packed layout, bit i of a block is bit 63 - i % 64 of big-endian word i // 64
+        self._words = -(-self.n // 64)
+        shifts = self.data_index - np.arange(self.k)
+        self._shifts = [
+            (np.uint64(shift), _bit_mask(np.flatnonzero(shifts == shift), self._words),
+             _bit_mask(self.data_index[shifts == shift], self._words))
+            for shift in np.unique(shifts)]
+        self._check_masks = np.array([
+            _bit_mask(np.flatnonzero(column), self._words) for column in self.generator[:, self.check_index].T])
+        self._parity_check_masks = np.array([
+            _bit_mask(np.flatnonzero(row), self._words) for row in self.parity_check])
+
+    def encode(self, data: np.ndarray) -> np.ndarray:
+        """
+        Encode data blocks, the last axis of the array holds the data bits.
+
+        :param data: numpy array of shape (..., k) with data to encode.
+        :return: numpy array of shape (..., n) with codewords.
+        """
+
+        data = np.asarray(data)
+        if data.ndim < 1 or data.shape[-1] != self.k:
+            raise ValueError(f'data should have {self.k} bits in the last axis')
+
+        code = np.zeros(data.shape[:-1] + (self.n,), dtype=np.int8)
+        code[..., self.data_index] = data
+        code[..., self.check_index] = data @ self.generator[:, self.check_index] & 1
+
+        return code
+
+    def decode(self, code: np.ndarray, out: typing.Optional[np.ndarray] = None,
+               errors_out: typing.Optional[np.ndarray] = None, inplace: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Decode codewords, the last axis of the array holds the code bits. Scratch buffers are kept per thread for the
+        last batch size, so decoding into given output buffers does not allocate memory proportional to the batch size,
+        apart from rows with errors.
+
+        :param code: numpy array of shape (..., n) with codewords.
+        :param out: optional C-contiguous array of shape (..., k) to store corrected data in.
+        :param errors_out: optional C-contiguous int64 array of shape (...) to store error positions in.
+        :param inplace: correct single errors in the code array itself, otherwise it is left unchanged.
+        :return: tuple of error positions of shape (...) and corrected data of shape (..., k). Error position is -1
+            if error is not found and DOUBLE_ERROR if double error is detected, the data is left uncorrected then.
+        """
+
+        code = np.asarray(code)
+        if code.ndim < 1 or code.shape[-1] != self.n:
+            raise ValueError(f'code should have {self.n} bits in the last axis')
+
+        rows = code.reshape(-1, self.n)
+        if inplace and not np.may_share_memory(rows, code):
+            raise ValueError('in-place decoding requires code array that can be reshaped without copying')
+
+        errors = _output(errors_out, code.shape[:-1], np.int64)
+        data = _output(out, code.shape[:-1] + (self.k,), np.int8)
+        flat_errors = errors.reshape(-1)
+        flat_data = data.reshape(-1, self.k)
+
+        syndrome, corrected = self._scratch(len(rows))
+        np.matmul(rows, self._parity_check_t, out=syndrome)
+        np.bitwise_and(syndrome, 1, out=syndrome)
+        np.matmul(syndrome, self._weights, out=flat_errors)
+        np.take(self.syndromes, flat_errors, out=flat_errors, mode='clip')
+        if rows.dtype == flat_data.dtype:
+            np.take(rows, self.data_index, axis=1, out=flat_data, mode='clip')
+        else:
+            # np.take refuses to cast, codewords of other types such as uint8 or bool are copied with a cast
+            np.copyto(flat_data, rows[:, self.data_index], casting='unsafe')
+
+        np.greater_equal(flat_errors, 0, out=corrected)
+        if corrected.any():
+            corrected = np.flatnonzero(corrected)
+            positions = flat_errors[corrected]
+            if inplace:
+                rows[corrected, positions] ^= True
+            columns = self._data_column[positions]
+            flat_data[corrected[columns >= 0], columns[columns >= 0]] ^= 1
+
+        return errors, data
+
+    def _scratch(self, rows: int) -> tuple[np.ndarray, np.ndarray]:
+        scratch = getattr(self._local, 'scratch', None)
+        if scratch is None or len(scratch[1]) != rows:
+            scratch = self._local.scratch = (
+                np.empty((rows, len(self.parity_check)), dtype=np.int64), np.empty(rows, dtype=bool))
+        return scratch
+
+    def encode_packed(self, data) -> np.ndarray:
+        """
+        Encode bytes, every k / 8 bytes form a data block with bits in np.unpackbits order.
+
+        :param data: bytes-like object or uint8 numpy array, its length should be a multiple of k / 8.
+        :return: uint8 numpy array of shape (N, ceil(n / 8)), one codeword packed with np.packbits per row.
+        """
+
+        words = self._unpack_words(data, self.k)
+
+        code = np.zeros_like(words)
+        for shift, data_mask, _ in self._shifts:
+            code |= _shift_right(words & data_mask, shift)
+
+        checks = _parities(words, self._check_masks).astype(np.uint64)
+        for j, i in enumerate(self.check_index):
+            code[:, i // 64] |= checks[:, j] << np.uint64(63 - i % 64)
+
+        return self._pack_words(code, self.n)
+
+    def decode_packed(self, code) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Decode codewords produced by :meth:`encode_packed`. Input buffer is left unchanged.
+
+        :param code: bytes-like object or uint8 numpy array with packed codewords.
+        :return: tuple of error positions of shape (N,) and uint8 numpy array with corrected data bytes.
+            Error position is -1 if error is not found and DOUBLE_ERROR if double error is detected.
+        """
+
+        words = self._unpack_words(code, self.n)
+
+        errors = self.syndromes[_parities(words, self._parity_check_masks) @ self._weights]
+
+        rows = np.flatnonzero(errors >= 0)
+        words[rows, errors[rows] // 64] ^= np.uint64(1) << (np.uint64(63) - (errors[rows] % 64).astype(np.uint64))
+
+        data = np.zeros_like(words)
+        for shift, _, code_mask in self._shifts:
+            data |= _shift_left(words & code_mask, shift)
+
+        return errors, self._pack_words(data, self.k).reshape(-1)
+
+    def _unpack_words(self, buffer, bits: int) -> np.ndarray:
+        if self.k % 8 != 0:
+            raise ValueError('packed mode requires block length to be a multiple of 8 bits')
+
+        buffer = np.frombuffer(buffer, dtype=np.uint8) if not isinstance(buffer, np.ndarray) else buffer
+        size = -(-bits // 8)
+        if buffer.dtype != np.uint8 or buffer.size % size != 0:
+            raise ValueError(f'buffer should be uint8 with length multiple of {size} bytes')
+
+        words = np.zeros((buffer.size // size, self._words * 8), dtype=np.uint8)
+        words[:, :size] = buffer.reshape(-1, size)
+        return words.view('>u8').astype(np.uint64)
+
+    def _pack_words(self, words: np.ndarray, bits: int) -> np.ndarray:
+        return np.ascontiguousarray(words.astype('>u8').view(np.uint8)[:, :-(-bits // 8)])
+
+
+class HammingCode(LinearCode):
+    """
+    Extended Hamming code, parity bits are placed at power of two positions and the overall parity bit is the last one.
+    HammingCode(64) is the Hamming(72,64) code used in ECC memory.
+    """
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError('data length should be positive')
+
+        parity_bits = 0
+        while 2 ** parity_bits < k + parity_bits + 1:
+            parity_bits += 1
+
+        n = k + parity_bits + 1
+        position = np.arange(n) + 1
+        position[-1] = 0
+
+        data_index = np.flatnonzero(position & position - 1 > 0)
+
+        # one row per parity bit followed by the overall parity row
+        parity_check = np.vstack((
+            position >> np.arange(parity_bits)[:, np.newaxis] & 1,
+            np.ones(n, dtype=position.dtype)
+        )).astype(np.int8)
+
+        generator = np.zeros((k, n), dtype=np.int8)
+        generator[np.arange(k), data_index] = 1
+        generator[:, (1 << np.arange(parity_bits)) - 1] = parity_check[:-1, data_index].T
+        generator[:, -1] = generator.sum(axis=1) & 1
+
+        super().__init__(generator, parity_check, data_index)
+
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def of(cls, k: int) -> 'HammingCode':
+        """
+        Return cached code for data blocks of length k.
+        """
+
+        return cls(k)
+
+    @classmethod
+    def of_length(cls, n: int) -> 'HammingCode':
+        """
+        Return cached code for codewords of length n.
+        """
+
+        parity_bits = (n - 1).bit_length()
+        k = n - parity_bits - 1
+        if k < 1 or 2 ** (parity_bits - 1) >= k + parity_bits:
+            raise ValueError(f'unsupported code length {n}')
+        return cls.of(k)
+
+
+class HsiaoCode(LinearCode):
+    """
+    Hsiao odd-weight-column code. Data bits are followed by check bits, the columns of the parity-check matrix have
+    odd weight and are picked to keep row weights balanced. HsiaoCode(64) is the Hsiao(72,64) code used in ECC memory.
+    """
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError('data length should be positive')
+
+        check_bits = 2
+        while 2 ** (check_bits - 1) < k + check_bits:
+            check_bits += 1
+
+        columns = np.zeros((0, check_bits), dtype=bool)
+        for weight in range(3, check_bits + 1, 2):
+            candidates = np.array([
+                np.isin(np.arange(check_bits), c) for c in itertools.combinations(range(check_bits), weight)])
+            if len(columns) + len(candidates) <= k:
+                columns = np.vstack((columns, candidates))
+                continue
+
+            # take columns that add the least to the heaviest rows first
+            while len(columns) < k:
+                rows = columns.sum(axis=0)
+                best = np.lexsort((candidates @ rows, np.where(candidates, rows, -1).max(axis=1)))[0]
+                columns = np.vstack((columns, candidates[best]))
+                candidates = np.delete(candidates, best, axis=0)
+            break
+
+        parity_check = np.hstack((columns.T, np.eye(check_bits))).astype(np.int8)
+
+        generator = np.zeros((k, k + check_bits), dtype=np.int8)
+        generator[:, :k] = np.eye(k)
+        generator[:, k:] = parity_check[:, :k].T
+
+        super().__init__(generator, parity_check, np.arange(k))
+
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def of(cls, k: int) -> 'HsiaoCode':
+        """
+        Return cached code for data blocks of length k.
+        """
+
+        return cls(k)
+
 
 def encode(data: np.ndarray) -> np.ndarray:
     """
@@ -9,52 +299,408 @@ def encode(data: np.ndarray) -> np.ndarray:
     :return: encoded numpy array.
     """
 
-    parity_bits = 0
-    while 2 ** parity_bits < len(data) + parity_bits + 1:
-        parity_bits += 1
+    return HammingCode.of(len(data)).encode(data)
 
-    n = len(data) + parity_bits + 1
-    code = np.zeros(n, dtype=np.int8)
 
-    mask = np.arange(n) + 1
-    mask[-1] = 0
-    code[mask & mask - 1 > 0] = data
+def decode(code: np.ndarray, out: typing.Optional[np.ndarray] = None) -> tuple[int, np.ndarray]:
+    """
+    Decode Hamming code with single error correction and double error detection. Single error is corrected in place.
 
-    i = 1
-    while i < n - 1:
-        code[i - 1] = code[mask & i > 0].sum() & 1
-        i = i << 1
+    :param code: numpy array encoded with Hamming code.
+    :param out: optional numpy array to store corrected data in.
+    :return: tuple of error position and corrected data. If error is not found, return -1.
+    :throws ValueError: if double error is detected.
+    """
 
-    code[-1] = code.sum() & 1
+    error, data = HammingCode.of_length(len(code)).decode(code, out=out, inplace=True)
+    if error == DOUBLE_ERROR:
+        raise ValueError("Double error detected")
 
-    return code
+    return int(error), data
 
 
-def decode(code: np.ndarray) -> tuple[int, np.ndarray]:
+def encode_batch(data: np.ndarray) -> np.ndarray:
     """
-    Decode Hamming code with single error correction and double error detection.
+    Encode many data blocks at once with Hamming code with single error correction and double error detection.
 
-    :param code: numpy array encoded with Hamming code.
-    :return: tuple of error position and corrected data. If error is not found, return -1.
-    :throws ValueError: if double error is detected.
+    :param data: 2-D numpy array of shape (N, k), one data block per row.
+    :return: 2-D numpy array of shape (N, n) with one codeword per row.
+    """
+
+    data = np.asarray(data)
+    if data.ndim != 2:
+        raise ValueError('data should be a 2-D array')
+
+    return HammingCode.of(data.shape[1]).encode(data)
+
+
+def decode_batch(code: np.ndarray, out: typing.Optional[np.ndarray] = None,
+                 errors_out: typing.Optional[np.ndarray] = None, inplace: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode many Hamming codewords at once with single error correction and double error detection.
+
+    :param code: 2-D numpy array of shape (N, n), one codeword per row.
+    :param out: optional C-contiguous array of shape (N, k) to store corrected data in.
+    :param errors_out: optional C-contiguous int64 array of shape (N,) to store error positions in.
+    :param inplace: correct single errors in the code array itself, otherwise it is left unchanged.
+    :return: tuple of error positions and corrected data of shape (N, k). Error position is -1 if error is not found
+        and DOUBLE_ERROR if double error is detected, in which case the data row is returned uncorrected.
+    """
+
+    code = np.asarray(code)
+    if code.ndim != 2:
+        raise ValueError('code should be a 2-D array')
+
+    return HammingCode.of_length(code.shape[1]).decode(code, out, errors_out, inplace)
+
+
+def encode_packed(data, k: int = 64) -> np.ndarray:
+    """
+    Encode bytes with Hamming code with single error correction and double error detection.
+
+    :param data: bytes-like object or uint8 numpy array, its length should be a multiple of k / 8.
+    :param k: number of data bits per block, should be a multiple of 8.
+    :return: uint8 numpy array of shape (N, ceil(n / 8)), one packed codeword per row.
+    """
+
+    return HammingCode.of(k).encode_packed(data)
+
+
+def decode_packed(code, k: int = 64) -> tuple[np.ndarray, np.ndarray]:
     """
+    Decode bytes encoded with :func:`encode_packed`.
 
-    mask = np.arange(len(code)) + 1
-    mask[-1] = 0
+    :param code: bytes-like object or uint8 numpy array with packed codewords.
+    :param k: number of data bits per block, should be a multiple of 8.
+    :return: tuple of error positions of shape (N,) and uint8 numpy array with corrected data bytes.
+    """
+
+    return HammingCode.of(k).decode_packed(code)
+
+
+def interleave(code: np.ndarray, depth: int) -> np.ndarray:
+    """
+    Interleave codewords, so every frame of depth codewords is sent bit by bit across all of them. A burst error of
+    up to depth bits then hits each codeword at most once.
+
+    :param code: 2-D numpy array of shape (N, n), N should be a multiple of depth.
+    :param depth: number of codewords per frame.
+    :return: 2-D numpy array of shape (N / depth, n * depth), one frame per row.
+    """
 
-    error = -1
-    i = 1
-    while i < len(code) - 1:
-        error += i * (code[mask & i > 0].sum() & 1)
-        i = i << 1
+    code = np.asarray(code)
+    if code.ndim != 2 or len(code) % depth != 0:
+        raise ValueError(f'code should be a 2-D array with number of rows multiple of {depth}')
+
+    return code.reshape(-1, depth, code.shape[1]).transpose(0, 2, 1).reshape(-1, code.shape[1] * depth)
+
+
+def deinterleave(frames: np.ndarray, depth: int) -> np.ndarray:
+    """
+    Restore codewords from frames produced by :func:`interleave`.
+
+    :param frames: 2-D numpy array of shape (N / depth, n * depth), one frame per row.
+    :param depth: number of codewords per frame.
+    :return: 2-D numpy array of shape (N, n), one codeword per row.
+    """
 
-    parity = code.sum() & 1
-    if error >= 0:
-        if parity == 1:
-            code[error] ^= 1
+    frames = np.asarray(frames)
+    if frames.ndim != 2 or frames.shape[1] % depth != 0:
+        raise ValueError(f'frames should be a 2-D array with number of columns multiple of {depth}')
+
+    return frames.reshape(len(frames), -1, depth).transpose(0, 2, 1).reshape(-1, frames.shape[1] // depth)
+
+
+def encode_interleaved(data: np.ndarray, depth: int) -> np.ndarray:
+    """
+    Encode many data blocks with :func:`encode_batch` and interleave the codewords with the given depth.
+
+    :param data: 2-D numpy array of shape (N, k), N should be a multiple of depth.
+    :param depth: number of codewords per frame.
+    :return: 2-D numpy array of shape (N / depth, n * depth), one frame per row.
+    """
+
+    return interleave(encode_batch(data), depth)
+
+
+def decode_interleaved(frames: np.ndarray, depth: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Deinterleave frames produced by :func:`encode_interleaved` and decode them with :func:`decode_batch`.
+
+    :param frames: 2-D numpy array of shape (N / depth, n * depth), one frame per row.
+    :param depth: number of codewords per frame.
+    :return: tuple of error positions of shape (N,) and corrected data of shape (N, k).
+    """
+
+    return decode_batch(deinterleave(frames, depth))
+
+
+class DecodeStats(typing.NamedTuple):
+    blocks: int
+    corrected: int
+    uncorrectable: int
+
+
+def encode_stream(source: typing.BinaryIO, target: typing.BinaryIO, k: int = 64, chunk: int = 65536) -> int:
+    """
+    Encode binary stream with Hamming code chunk by chunk, so memory use does not depend on the stream size.
+
+    The last data block is padded with zeros and followed by a trailer block that holds the number of padding bytes.
+
+    :param source: binary stream to read data from.
+    :param target: binary stream to write packed codewords to.
+    :param k: number of data bits per block, should be a multiple of 8.
+    :param chunk: number of blocks encoded at once.
+    :return: number of data bytes read from the source.
+    """
+
+    codec = HammingCode.of(k)
+    block = k // 8
+    buffer = memoryview(bytearray(block * chunk))
+
+    size = 0
+    while True:
+        read = _read_into(source, buffer)
+        size += read
+        if read < len(buffer):
+            break
+        target.write(codec.encode_packed(buffer))
+
+    padding = -read % block
+    buffer[read:read + padding] = bytes(padding)
+    target.write(codec.encode_packed(buffer[:read + padding]))
+    target.write(codec.encode_packed(padding.to_bytes(block, 'big')))
+    return size
+
+
+def decode_stream(source: typing.BinaryIO, target: typing.BinaryIO, k: int = 64, chunk: int = 65536) -> DecodeStats:
+    """
+    Decode binary stream produced by :func:`encode_stream` chunk by chunk. Blocks with double error are written
+    uncorrected.
+
+    :param source: binary stream to read packed codewords from.
+    :param target: binary stream to write data to.
+    :param k: number of data bits per block, should be a multiple of 8.
+    :param chunk: number of blocks decoded at once.
+    :return: number of decoded, corrected and uncorrectable blocks.
+    """
+
+    codec = HammingCode.of(k)
+    block = k // 8
+    buffer = memoryview(bytearray(-(-codec.n // 8) * chunk))
+
+    # the last data block and the trailer are held back until the end of stream
+    pending = b''
+    blocks = corrected = uncorrectable = 0
+    while True:
+        read = _read_into(source, buffer)
+        errors, data = codec.decode_packed(buffer[:read])
+        blocks += len(errors)
+        corrected += np.count_nonzero(errors >= 0)
+        uncorrectable += np.count_nonzero(errors == DOUBLE_ERROR)
+
+        if len(data) >= 2 * block:
+            target.write(pending)
+            target.write(data[:-2 * block])
+            pending = data[-2 * block:].tobytes()
         else:
-            raise ValueError("Double error detected")
-    elif parity == 1:
-        error = len(code) - 1
+            pending += data.tobytes()
+            target.write(pending[:-2 * block])
+            pending = pending[-2 * block:]
+
+        if read < len(buffer):
+            break
+
+    if len(pending) < block:
+        raise ValueError('stream is truncated')
+    padding = int.from_bytes(pending[-block:], 'big')
+    if padding >= block or padding > len(pending) - block:
+        raise ValueError('stream trailer is corrupted')
+    target.write(pending[:len(pending) - block - padding])
+
+    return DecodeStats(blocks, int(corrected), int(uncorrectable))
+
+
+def encode_parallel(data, k: int = 64, workers: typing.Optional[int] = None) -> np.ndarray:
+    """
+    Encode bytes with :func:`encode_packed` using a pool of processes. Input is split into block-aligned shards that
+    are passed to workers through shared memory.
+
+    :param data: bytes-like object or uint8 numpy array, its length should be a multiple of k / 8.
+    :param k: number of data bits per block, should be a multiple of 8.
+    :param workers: number of worker processes, defaults to the number of CPUs.
+    :return: uint8 numpy array of shape (N, ceil(n / 8)), one packed codeword per row.
+    """
+
+    codec = HammingCode.of(k)
+    data = _as_bytes(data, codec.k)
+
+    with contextlib.ExitStack() as stack:
+        source = stack.enter_context(_shared_array(data.shape, np.uint8))
+        source.array[:] = data
+        target = stack.enter_context(_shared_array((len(data) // (k // 8), -(-codec.n // 8)), np.uint8))
+
+        _run_shards(_encode_shard, len(target.array), workers, k, source.name, target.name)
+        return target.array.copy()
+
+
+def decode_parallel(code, k: int = 64, workers: typing.Optional[int] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode bytes encoded with :func:`encode_packed` using a pool of processes. Input is split into block-aligned shards
+    that are passed to workers through shared memory.
+
+    :param code: bytes-like object or uint8 numpy array with packed codewords.
+    :param k: number of data bits per block, should be a multiple of 8.
+    :param workers: number of worker processes, defaults to the number of CPUs.
+    :return: tuple of error positions of shape (N,) and uint8 numpy array with corrected data bytes.
+    """
+
+    codec = HammingCode.of(k)
+    code = _as_bytes(code, codec.n)
+    blocks = len(code) // -(-codec.n // 8)
+
+    with contextlib.ExitStack() as stack:
+        source = stack.enter_context(_shared_array(code.shape, np.uint8))
+        source.array[:] = code
+        errors = stack.enter_context(_shared_array((blocks,), np.int64))
+        target = stack.enter_context(_shared_array((blocks * (k // 8),), np.uint8))
+
+        _run_shards(_decode_shard, blocks, workers, k, source.name, errors.name, target.name)
+        return errors.array.copy(), target.array.copy()
+
+
+class _SharedArray(typing.NamedTuple):
+    name: str
+    array: np.ndarray
+
+
+@contextlib.contextmanager
+def _shared_array(shape: tuple, dtype) -> typing.Iterator[_SharedArray]:
+    memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+    try:
+        yield _SharedArray(memory.name, np.ndarray(shape, dtype=dtype, buffer=memory.buf))
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+@contextlib.contextmanager
+def _attach(name: str, dtype) -> typing.Iterator[np.ndarray]:
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        yield np.ndarray((memory.size // np.dtype(dtype).itemsize,), dtype=dtype, buffer=memory.buf)
+    finally:
+        memory.close()
+
+
+def _run_shards(fn, blocks: int, workers: typing.Optional[int], *args):
+    workers = workers or os.cpu_count()
+    bounds = np.linspace(0, blocks, min(blocks, workers * 4) + 1).astype(int)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(fn, *args, start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]:
+            future.result()
+
+
+def _encode_shard(k: int, data_name: str, code_name: str, start: int, stop: int):
+    codec = HammingCode.of(k)
+    size = -(-codec.n // 8)
+    with _attach(data_name, np.uint8) as data, _attach(code_name, np.uint8) as code:
+        code[start * size:stop * size] = codec.encode_packed(data[start * k // 8:stop * k // 8]).reshape(-1)
+
+
+def _decode_shard(k: int, code_name: str, errors_name: str, data_name: str, start: int, stop: int):
+    codec = HammingCode.of(k)
+    size = -(-codec.n // 8)
+    with _attach(code_name, np.uint8) as code, _attach(errors_name, np.int64) as errors, \
+            _attach(data_name, np.uint8) as data:
+        errors[start:stop], data[start * k // 8:stop * k // 8] = codec.decode_packed(code[start * size:stop * size])
+
+
+def _as_bytes(buffer, bits: int) -> np.ndarray:
+    buffer = np.frombuffer(buffer, dtype=np.uint8) if not isinstance(buffer, np.ndarray) else buffer.reshape(-1)
+    if buffer.dtype != np.uint8 or buffer.size % -(-bits // 8) != 0:
+        raise ValueError(f'buffer should be uint8 with length multiple of {-(-bits // 8)} bytes')
+    return buffer
+
+
+def _read_into(source: typing.BinaryIO, buffer: memoryview) -> int:
+    size = 0
+    while size < len(buffer):
+        read = source.readinto(buffer[size:])
+        if not read:
+            break
+        size += read
+    return size
+
+
+def _output(out: typing.Optional[np.ndarray], shape: tuple, dtype) -> np.ndarray:
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape or out.dtype != dtype or not out.flags.c_contiguous:
+        raise ValueError(f'output array should be C-contiguous {np.dtype(dtype).name} array with shape {shape}')
+    return out
+
+
+def _bit_mask(indices, words: int) -> np.ndarray:
+    mask = np.zeros(words, dtype=np.uint64)
+    for i in indices:
+        mask[i // 64] |= np.uint64(1) << np.uint64(63 - i % 64)
+    return mask
+
+
+def _parities(words: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    parities = np.empty((len(words), len(masks)), dtype=np.uint8)
+    folded = np.empty(len(words), dtype=np.uint64)
+    for j, mask in enumerate(masks):
+        np.bitwise_and(words[:, 0], mask[0], out=folded)
+        for i in range(1, len(mask)):
+            folded ^= words[:, i] & mask[i]
+        np.bitwise_count(folded, out=parities[:, j])
+    return parities & 1
+
+
+def _shift_right(words: np.ndarray, shift: np.uint64) -> np.ndarray:
+    if not shift:
+        return words
+    shifted = words >> shift
+    shifted[:, 1:] |= words[:, :-1] << (np.uint64(64) - shift)
+    return shifted
+
+
+def _shift_left(words: np.ndarray, shift: np.uint64) -> np.ndarray:
+    if not shift:
+        return words
+    shifted = words << shift
+    shifted[:, :-1] |= words[:, 1:] >> (np.uint64(64) - shift)
+    return shifted
+
+
+def main(args):
+    with contextlib.ExitStack() as stack:
+        source = sys.stdin.buffer if args.input == '-' else stack.enter_context(open(args.input, 'rb'))
+        target = sys.stdout.buffer if args.output == '-' else stack.enter_context(open(args.output, 'wb'))
+
+        if args.command == 'encode':
+            encode_stream(source, target, args.k, args.chunk)
+            return 0
+
+        stats = decode_stream(source, target, args.k, args.chunk)
+
+    print(f'blocks: {stats.blocks}, corrected: {stats.corrected}, uncorrectable: {stats.uncorrectable}',
+          file=sys.stderr)
+    return 1 if stats.uncorrectable else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Protect files with Hamming code.', add_help=False)
+    parser.add_argument('command', choices=('encode', 'decode'), help='Encode or decode the input.')
+    parser.add_argument('input', help='Input file, - for standard input.')
+    parser.add_argument('output', help='Output file, - for standard output.')
+    parser.add_argument('-k', type=int, default=64, help='Number of data bits per block, multiple of 8.')
+    parser.add_argument('-c', '--chunk', type=int, default=65536, help='Number of blocks processed at once.')
+    parser.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS, help='Display detailed help.')
+    return parser.parse_args()
+
 
-    return int(error), code[mask & mask - 1 > 0]
+if __name__ == '__main__':
+    sys.exit(main(parse_args()))
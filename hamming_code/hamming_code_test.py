@@ -1,9 +1,13 @@
+import io
 import itertools
+import tracemalloc
 import unittest
 
 import numpy as np
 
-from hamming_code import encode, decode
+from hamming_code import encode, decode, encode_batch, decode_batch, encode_packed, decode_packed, encode_stream, \
+    decode_stream, encode_parallel, decode_parallel, encode_interleaved, decode_interleaved, interleave, deinterleave, \
+    DOUBLE_ERROR, HammingCode, HsiaoCode
 
 
 class TestHammingCodeNumpy(unittest.TestCase):
@@ -48,5 +52,397 @@ class TestHammingCodeNumpy(unittest.TestCase):
                             decode(code)
 
 
+class TestHammingCodeBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.array(list(itertools.product([0, 1], repeat=8)))
+        self.code = encode_batch(self.data)
+
+    def test_encode(self):
+        for data, code in zip(self.data, self.code):
+            with self.subTest(msg=data):
+                assert np.array_equal(encode(data), code)
+
+    def test_no_error(self):
+        errors, decoded = decode_batch(self.code)
+
+        assert np.all(errors == -1)
+        assert np.array_equal(self.data, decoded)
+
+    def test_single_error(self):
+        for error in range(self.code.shape[1]):
+            with self.subTest(msg=f'error at {error}'):
+                code = self.code.copy()
+                code[:, error] ^= 1
+
+                errors, decoded = decode_batch(code)
+
+                assert np.all(errors == error)
+                assert np.array_equal(self.data, decoded)
+
+    def test_double_error(self):
+        for error1, error2 in itertools.combinations(range(self.code.shape[1]), 2):
+            with self.subTest(msg=f'errors at {error1} and {error2}'):
+                code = self.code.copy()
+                code[:, error1] ^= 1
+                code[:, error2] ^= 1
+
+                errors, _ = decode_batch(code)
+
+                assert np.all(errors == DOUBLE_ERROR)
+
+    def test_mixed_errors(self):
+        code = self.code.copy()
+        code[1, 3] ^= 1
+        code[2, 4] ^= 1
+        code[2, 7] ^= 1
+
+        errors, decoded = decode_batch(code)
+
+        assert errors[:3].tolist() == [-1, 3, DOUBLE_ERROR]
+        assert np.array_equal(self.data[:2], decoded[:2])
+        assert np.array_equal(self.data[3:], decoded[3:])
+
+
+class TestHammingCodeOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(42).integers(0, 2, (4096, 64), dtype=np.int8)
+        self.code = encode_batch(self.data)
+        self.out = np.empty_like(self.data)
+        self.errors_out = np.empty(len(self.data), dtype=np.int64)
+
+    def test_out(self):
+        code = self.code.copy()
+        code[1, 5] ^= 1
+
+        errors, decoded = decode_batch(code, out=self.out, errors_out=self.errors_out)
+
+        assert errors is self.errors_out and decoded is self.out
+        assert errors[:3].tolist() == [-1, 5, -1]
+        assert np.array_equal(self.data, decoded)
+        assert not np.array_equal(self.code, code)
+
+    def test_inplace(self):
+        code = self.code.copy()
+        code[1, 5] ^= 1
+        code[2, 6] ^= 1
+        code[2, 7] ^= 1
+
+        errors, _ = decode_batch(code, inplace=True)
+
+        assert errors[:3].tolist() == [-1, 5, DOUBLE_ERROR]
+        assert np.array_equal(self.code[:2], code[:2])
+        assert np.array_equal(self.code[3:], code[3:])
+
+    def test_input_dtypes(self):
+        for dtype in (np.uint8, bool, np.int64):
+            with self.subTest(dtype=dtype):
+                code = self.code.astype(dtype)
+                code[1, 5] ^= True
+
+                errors, decoded = decode_batch(code)
+                assert errors[:3].tolist() == [-1, 5, -1]
+                assert decoded.dtype == np.int8 and np.array_equal(self.data, decoded)
+
+                error, decoded = decode(code[1], out=self.out[1])
+                assert error == 5 and np.array_equal(self.data[1], decoded)
+
+                decode_batch(code, inplace=True)
+                assert np.array_equal(self.code, code)
+
+    def test_scalar_out(self):
+        code = self.code[0].copy()
+        code[3] ^= 1
+
+        out = self.out[0]
+
+        error, decoded = decode(code, out=out)
+
+        assert error == 3 and decoded is out
+        assert np.array_equal(self.code[0], code)
+        assert np.array_equal(self.data[0], self.out[0])
+
+    def test_no_allocations(self):
+        decode_batch(self.code, out=self.out, errors_out=self.errors_out)
+
+        tracemalloc.start()
+        try:
+            for _ in range(10):
+                decode_batch(self.code, out=self.out, errors_out=self.errors_out)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < self.data.nbytes // 4
+
+    def test_unsupported_out(self):
+        with self.assertRaises(ValueError):
+            decode_batch(self.code, out=self.out[:-1])
+        with self.assertRaises(ValueError):
+            decode_batch(self.code, out=self.out.T.copy().T)
+        with self.assertRaises(ValueError):
+            decode_batch(self.code, out=self.out.astype(np.uint8))
+        with self.assertRaises(ValueError):
+            decode_batch(self.code, out=self.out.astype(np.float64))
+        with self.assertRaises(ValueError):
+            decode_batch(self.code, errors_out=self.errors_out.astype(np.int32))
+
+
+class TestHammingCodeLayout(unittest.TestCase):
+
+    def test_cached(self):
+        assert HsiaoCode.of(11) is HsiaoCode.of(11) and HsiaoCode.of(11) is not HammingCode.of(11)
+        assert HammingCode.of(11) is HammingCode.of(11)
+        assert HammingCode.of_length(16) is HammingCode.of(11)
+
+    def test_unsupported_length(self):
+        for n in (0, 1, 2, 3, 9, 17):
+            with self.subTest(msg=n):
+                with self.assertRaises(ValueError):
+                    HammingCode.of_length(n)
+
+    def test_generator(self):
+        for k in (1, 4, 8, 11, 26, 57, 64, 120):
+            with self.subTest(msg=k):
+                codec = HammingCode.of(k)
+
+                assert codec.generator.shape == (k, codec.n)
+                assert not np.any(codec.generator @ codec.parity_check.T & 1)
+
+    def test_syndromes(self):
+        for k in (1, 4, 8, 11, 26, 57, 64, 120):
+            with self.subTest(msg=k):
+                codec = HammingCode.of(k)
+
+                positions = codec.syndromes[codec.syndromes >= 0]
+
+                assert np.array_equal(np.sort(positions), np.arange(codec.n))
+
+
+class TestHammingCodePacked(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(42).integers(0, 256, 512, dtype=np.uint8)
+
+    def test_bit_exact(self):
+        for k in (8, 16, 64, 256, 4096):
+            with self.subTest(msg=k):
+                code = encode_packed(self.data.tobytes(), k)
+
+                expected = encode_batch(np.unpackbits(self.data).reshape(-1, k))
+                assert np.array_equal(code, np.packbits(expected, axis=1))
+
+    def test_no_error(self):
+        for data in (self.data, self.data.tobytes(), memoryview(self.data.tobytes())):
+            with self.subTest(msg=type(data)):
+                errors, decoded = decode_packed(encode_packed(data))
+
+                assert np.all(errors == -1)
+                assert np.array_equal(self.data, decoded)
+
+    def test_single_error(self):
+        for k in (8, 64, 256):
+            code = encode_packed(self.data, k)
+            for error in range(HammingCode.of(k).n):
+                with self.subTest(msg=f'{k} with error at {error}'):
+                    corrupted = code.copy()
+                    corrupted[:, error // 8] ^= 0x80 >> error % 8
+
+                    errors, decoded = decode_packed(corrupted, k)
+
+                    assert np.all(errors == error)
+                    assert np.array_equal(self.data, decoded)
+
+    def test_double_error(self):
+        code = encode_packed(self.data)
+        for error1, error2 in itertools.combinations(range(HammingCode.of(64).n), 2):
+            with self.subTest(msg=f'errors at {error1} and {error2}'):
+                corrupted = code.copy()
+                corrupted[:, error1 // 8] ^= 0x80 >> error1 % 8
+                corrupted[:, error2 // 8] ^= 0x80 >> error2 % 8
+
+                errors, _ = decode_packed(corrupted)
+
+                assert np.all(errors == DOUBLE_ERROR)
+
+    def test_unsupported_buffer(self):
+        with self.assertRaises(ValueError):
+            encode_packed(self.data[:7])
+        with self.assertRaises(ValueError):
+            encode_packed(self.data, k=11)
+
+
+class TestHammingCodeStream(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(42).integers(0, 256, 1000, dtype=np.uint8).tobytes()
+
+    def test_round_trip(self):
+        for k, size, chunk in itertools.product((8, 64, 256), (0, 1, 7, 8, 9, 64, 1000), (1, 3, 64)):
+            with self.subTest(msg=f'{size} bytes with k={k} and chunk={chunk}'):
+                code = io.BytesIO()
+                decoded = io.BytesIO()
+
+                assert encode_stream(io.BytesIO(self.data[:size]), code, k, chunk) == size
+                stats = decode_stream(io.BytesIO(code.getvalue()), decoded, k, chunk)
+
+                assert decoded.getvalue() == self.data[:size]
+                assert stats == (-(-size // (k // 8)) + 1, 0, 0)
+
+    def test_errors(self):
+        code = io.BytesIO()
+        encode_stream(io.BytesIO(self.data), code, chunk=16)
+        code = bytearray(code.getvalue())
+        code[0] ^= 0x01
+        code[90] ^= 0x10
+        code[95] ^= 0x01
+        code[200] ^= 0x80
+        decoded = io.BytesIO()
+
+        stats = decode_stream(io.BytesIO(code), decoded, chunk=16)
+
+        assert stats == (126, 2, 1)
+        assert decoded.getvalue()[:80] == self.data[:80]
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            decode_stream(io.BytesIO(), io.BytesIO())
+
+
+class TestHammingCodeParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(42).integers(0, 256, 8000, dtype=np.uint8)
+
+    def test_encode(self):
+        for k in (8, 64, 256):
+            with self.subTest(msg=k):
+                code = encode_parallel(self.data, k, workers=2)
+
+                assert np.array_equal(encode_packed(self.data, k), code)
+
+    def test_decode(self):
+        code = encode_packed(self.data)
+        code[3, 0] ^= 0x10
+        code[5, 1] ^= 0x03
+
+        errors, decoded = decode_parallel(code, workers=2)
+
+        assert errors[:6].tolist() == [-1, -1, -1, 3, -1, DOUBLE_ERROR]
+        assert np.all(errors[6:] == -1)
+        assert np.array_equal(self.data[:40], decoded[:40])
+        assert np.array_equal(self.data[48:], decoded[48:])
+
+
+class TestHammingCodeInterleaved(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(42).integers(0, 2, (64, 11))
+
+    def test_layout(self):
+        code = encode_batch(self.data)
+
+        frames = interleave(code, 4)
+
+        assert frames.shape == (16, 64)
+        assert np.array_equal(frames[1, :4], code[4:8, 0])
+        assert np.array_equal(deinterleave(frames, 4), code)
+
+    def test_burst_error(self):
+        for depth in (1, 2, 4, 8, 16):
+            frames = encode_interleaved(self.data, depth)
+            for start in range(frames.shape[1] - depth + 1):
+                with self.subTest(msg=f'depth {depth} with burst at {start}'):
+                    corrupted = frames.copy()
+                    corrupted[:, start:start + depth] ^= 1
+
+                    errors, decoded = decode_interleaved(corrupted, depth)
+
+                    assert np.all(errors >= 0)
+                    assert np.array_equal(self.data, decoded)
+
+    def test_long_burst_error(self):
+        for depth in (1, 2, 4, 8, 16):
+            frames = encode_interleaved(self.data, depth)
+            for start in range(frames.shape[1] - depth - 1):
+                with self.subTest(msg=f'depth {depth} with burst at {start}'):
+                    corrupted = frames.copy()
+                    corrupted[:, start:start + depth + 1] ^= 1
+
+                    errors, _ = decode_interleaved(corrupted, depth)
+
+                    assert np.any(errors == DOUBLE_ERROR)
+
+    def test_unsupported_depth(self):
+        with self.assertRaises(ValueError):
+            encode_interleaved(self.data, 5)
+
+
+class TestMemoryCodes(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(42).integers(0, 2, (64, 64))
+        self.codecs = (HammingCode.of(64), HsiaoCode.of(64))
+
+    def test_geometry(self):
+        for codec in self.codecs:
+            with self.subTest(msg=type(codec).__name__):
+                assert (codec.k, codec.n) == (64, 72)
+                assert not np.any(codec.generator @ codec.parity_check.T & 1)
+
+    def test_hsiao_columns(self):
+        parity_check = HsiaoCode.of(64).parity_check
+
+        assert np.all(parity_check.sum(axis=0) % 2 == 1)
+        assert np.unique(parity_check, axis=1).shape == (8, 72)
+        assert np.all(parity_check.sum(axis=1) == 27)
+
+    def test_no_error(self):
+        for codec in self.codecs:
+            with self.subTest(msg=type(codec).__name__):
+                errors, decoded = codec.decode(codec.encode(self.data))
+
+                assert np.all(errors == -1)
+                assert np.array_equal(self.data, decoded)
+
+    def test_single_error(self):
+        for codec in self.codecs:
+            code = codec.encode(self.data)
+            for error in range(codec.n):
+                with self.subTest(msg=f'{type(codec).__name__} with error at {error}'):
+                    corrupted = code.copy()
+                    corrupted[:, error] ^= 1
+
+                    errors, decoded = codec.decode(corrupted)
+
+                    assert np.all(errors == error)
+                    assert np.array_equal(self.data, decoded)
+
+    def test_double_error(self):
+        for codec in self.codecs:
+            code = codec.encode(self.data[:1])
+            for error1, error2 in itertools.combinations(range(codec.n), 2):
+                with self.subTest(msg=f'{type(codec).__name__} with errors at {error1} and {error2}'):
+                    corrupted = code.copy()
+                    corrupted[:, error1] ^= 1
+                    corrupted[:, error2] ^= 1
+
+                    errors, _ = codec.decode(corrupted)
+
+                    assert np.all(errors == DOUBLE_ERROR)
+
+    def test_packed(self):
+        for codec in self.codecs:
+            with self.subTest(msg=type(codec).__name__):
+                data = np.packbits(self.data)
+
+                code = codec.encode_packed(data)
+                errors, decoded = codec.decode_packed(code)
+
+                assert np.array_equal(np.packbits(codec.encode(self.data), axis=1), code)
+                assert np.array_equal(data, decoded)
+
+
 if __name__ == '__main__':
     unittest.main()
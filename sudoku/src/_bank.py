@@ -0,0 +1,85 @@
+import mmap
+import os
+from typing import Sequence
+
+from _solver import DIFFICULTIES
+
+__all__ = (
+    'PuzzleBank',
+    'pack',
+    'unpack'
+)
+
+RECORD_SIZE = 41
+
+
+def pack(grid: Sequence) -> bytes:
+    """
+    Pack 81 cells of a puzzle into 41 bytes, two cells per byte, 0 for empty cells.
+    """
+
+    digits = [int(value) if value not in (' ', '.') else 0 for value in grid] + [0]
+    return bytes(digits[i] << 4 | digits[i + 1] for i in range(0, 82, 2))
+
+
+def unpack(record: bytes) -> str:
+    """
+    Unpack a puzzle packed by :func:`pack` into a string of 81 cells, '.' for empty cells.
+    """
+
+    return ''.join(f'{byte >> 4}{byte & 0xf}' for byte in record)[:81].replace('0', '.')
+
+
+class PuzzleBank:
+    """
+    Puzzles stored in fixed size records, one file per difficulty.
+
+    Files are memory-mapped, so a puzzle is read by its difficulty and index without loading the whole bank.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._files = {}
+        self._maps = {}
+        for difficulty in DIFFICULTIES:
+            name = self.filename(path, difficulty)
+            if os.path.exists(name) and os.path.getsize(name) >= RECORD_SIZE:
+                self._files[difficulty] = open(name, 'rb')
+                self._maps[difficulty] = mmap.mmap(self._files[difficulty].fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def filename(path: str, difficulty: str) -> str:
+        return os.path.join(path, f'{difficulty}.bank')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return sum(self.count(difficulty) for difficulty in DIFFICULTIES)
+
+    def __getitem__(self, item: tuple[str, int]) -> str:
+        """
+        Return puzzle by difficulty and index as a string of 81 cells, '.' for empty cells.
+        """
+
+        difficulty, index = item
+        count = self.count(difficulty)
+        if not -count <= index < count:
+            raise IndexError(f'{difficulty} puzzle index out of range')
+        offset = index % count * RECORD_SIZE
+        return unpack(self._maps[difficulty][offset:offset + RECORD_SIZE])
+
+    def count(self, difficulty: str) -> int:
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f'unsupported difficulty, expected one of {", ".join(DIFFICULTIES)}')
+        return len(self._maps[difficulty]) // RECORD_SIZE if difficulty in self._maps else 0
+
+    def close(self):
+        for difficulty in self._maps:
+            self._maps[difficulty].close()
+            self._files[difficulty].close()
+        self._maps.clear()
+        self._files.clear()
@@ -1,6 +1,7 @@
-import collections
 import random
 
+from _solver import _UNITS, _UNIT_CELLS, count_solutions
+
 
 class Grid:
     _view: str = """\
@@ -21,11 +22,20 @@ class Grid:
 
     def __init__(self, filling_percent=0.25):
         self._state = [' ' for _ in range(9 * 9)]
+
+        # number of every digit in every row, column and square, number of duplicated digits in every unit,
+        # number of units with duplicates every cell belongs to, and cells of such units, all kept by __setitem__
+        self._counts = [[0] * 10 for _ in range(27)]
+        self._duplicates = [0] * 27
+        self._conflicts = [0] * 81
+        self._mistakes = set()
+        self._empty = 9 * 9
+
         self._fill()
         if not self.is_resolved():
             raise ValueError('generated grid is not resolved')
         self._clean(filling_percent)
-        self._unmodified = tuple(divmod(i, 9) for i, v in enumerate(self._state) if v != ' ')
+        self._unmodified = frozenset(divmod(i, 9) for i, v in enumerate(self._state) if v != ' ')
 
     def __getitem__(self, key):
         if isinstance(key, tuple):
@@ -37,7 +47,19 @@ class Grid:
             raise ValueError('unsupported value')
         if isinstance(key, tuple):
             key = key[0] * 9 + key[1]
+
+        previous = self._state[key]
+        if previous == value:
+            return
+        if previous == ' ':
+            self._empty -= 1
+        else:
+            self._count(key, int(previous), -1)
         self._state[key] = value
+        if value == ' ':
+            self._empty += 1
+        else:
+            self._count(key, int(value), 1)
 
     def __repr__(self):
         return self._view % tuple(self._state)
@@ -46,72 +68,113 @@ class Grid:
     def unmodified(self):
         return self._unmodified
 
+    @property
+    def empty(self):
+        return self._empty
+
     def is_resolved(self):
-        if ' ' in self._state:
-            return False
-        for _ in self.mistakes():
-            return False
-        return True
+        return self._empty == 0 and not self._mistakes
 
     def mistakes(self):
-        for items in self._slices():
-            for _, count in collections.Counter(i for _, _, i in items if i != ' ').items():
-                if count > 1:
-                    yield from tuple((x, y) for x, y, _ in items)
+        """
+        Return set of (y, x) cells of every row, column and square with a duplicated digit. The set is kept up to date
+        by the grid and should not be modified.
+        """
+
+        return self._mistakes
+
+    def _count(self, i, digit, delta):
+        for unit in _UNITS[i]:
+            counts = self._counts[unit]
+            counts[digit] += delta
+            # unit gets or loses a duplicate when the digit count changes between 1 and 2
+            if counts[digit] == (2 if delta > 0 else 1):
+                self._duplicates[unit] += delta
+                if self._duplicates[unit] == (1 if delta > 0 else 0):
+                    for cell in _UNIT_CELLS[unit]:
+                        self._conflicts[cell] += delta
+                        if self._conflicts[cell] == (1 if delta > 0 else 0):
+                            if delta > 0:
+                                self._mistakes.add(divmod(cell, 9))
+                            else:
+                                self._mistakes.discard(divmod(cell, 9))
 
     def _fill(self):
-        for idx in range(9 * 9):
-            y, x = divmod(idx, 9)
-            if self[y, x] == ' ':
-                for value in random.sample([str(i) for i in range(1, 10)], k=9):
-                    items = self._slice_row(y) + self._slice_column(x) + self._slice_square(y // 3 * 3, x // 3 * 3)
-                    if value not in [i for _, _, i in items]:
-                        self[y, x] = value
-                        if self.is_resolved():
-                            return True
-                        if self._fill():
-                            return True
-                break
-        self[y, x] = ' '
+        if all(value == ' ' for value in self._state):
+            # squares on the diagonal do not share rows and columns, any permutations of digits are valid for them
+            for s in range(0, 9, 3):
+                for i, value in enumerate(random.sample('123456789', k=9)):
+                    self[s + i // 3, s + i % 3] = value
+
+        # digits used in every row, column and square as 9-bit masks, bit d - 1 is set when digit d is used
+        used = [0] * 27
+        digits = [0] * 81
+        for i, value in enumerate(self._state):
+            if value != ' ':
+                digits[i] = int(value)
+                for unit in _UNITS[i]:
+                    used[unit] |= 1 << digits[i] - 1
+
+        if not self._search([i for i in range(81) if not digits[i]], used, digits):
+            return False
+        for i, digit in enumerate(digits):
+            self[i] = str(digit)
+        return True
+
+    @staticmethod
+    def _search(empty, used, digits):
+        if not empty:
+            return True
+
+        # continue with the most constrained cell, that has the fewest candidates
+        best, best_mask, best_count = 0, 0, 10
+        for n, i in enumerate(empty):
+            row, column, square = _UNITS[i]
+            mask = ~(used[row] | used[column] | used[square]) & 0x1ff
+            count = mask.bit_count()
+            if count < best_count:
+                best, best_mask, best_count = n, mask, count
+                if count <= 1:
+                    break
+        if best_count == 0:
+            return False
+
+        cell = empty[best]
+        empty[best] = empty[-1]
+        empty.pop()
+        row, column, square = _UNITS[cell]
+        candidates = [d for d in range(9) if best_mask >> d & 1]
+        random.shuffle(candidates)
+        for d in candidates:
+            bit = 1 << d
+            used[row] |= bit
+            used[column] |= bit
+            used[square] |= bit
+            digits[cell] = d + 1
+            if Grid._search(empty, used, digits):
+                return True
+            used[row] ^= bit
+            used[column] ^= bit
+            used[square] ^= bit
+
+        digits[cell] = 0
+        empty.append(cell)
+        empty[best], empty[-1] = empty[-1], empty[best]
+        return False
 
     def _clean(self, percent):
         if percent < 0.01 or percent > 0.99:
             raise ValueError('filling percent should be in range [0.01, 0.99]')
 
-        for _ in range(int(9 * 9 * (1 - percent))):
-            y = random.randint(0, 8)
-            x = random.randint(0, 8)
-            while self[y, x] == ' ':
-                y = random.randint(0, 8)
-                x = random.randint(0, 8)
-            self[y, x] = ' '
-
-    def _slices(self):
-        for i in range(3):
-            for j in range(3):
-                yield self._slice_square(i * 3, j * 3)
-        for i in range(9):
-            yield self._slice_row(i)
-            yield self._slice_column(i)
-
-    def _slice_square(self, sy, sx):
-        def fn():
-            for y in range(3):
-                for x in range(3):
-                    yield sy + y, sx + x, self[sy + y, sx + x]
-
-        return tuple(fn())
-
-    def _slice_row(self, sy):
-        def fn():
-            for x in range(9):
-                yield sy, x, self[sy, x]
-
-        return tuple(fn())
-
-    def _slice_column(self, sx):
-        def fn():
-            for y in range(9):
-                yield y, sx, self[y, sx]
-
-        return tuple(fn())
+        # a cell is cleaned only if the puzzle still has a unique solution, so cleaning may stop with more cells filled
+        # than requested, when none of them can be removed
+        count = int(9 * 9 * (1 - percent))
+        for i in random.sample(range(9 * 9), k=9 * 9):
+            if count == 0:
+                break
+            value = self[i]
+            self[i] = ' '
+            if count_solutions(self._state, limit=2) == 1:
+                count -= 1
+            else:
+                self[i] = value
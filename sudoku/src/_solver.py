@@ -0,0 +1,191 @@
+import collections
+from typing import Iterator, Optional, Sequence
+
+__all__ = (
+    'DIFFICULTIES',
+    'Solver',
+    'solve',
+    'count_solutions',
+    'grade'
+)
+
+DIFFICULTIES = ('easy', 'medium', 'hard', 'expert')
+
+# indices of row, column and square of every cell, and cells of every row, column and square
+_UNITS = tuple((i // 9, 9 + i % 9, 18 + i // 27 * 3 + i % 9 // 3) for i in range(81))
+_UNIT_CELLS = tuple(tuple(i for i in range(81) if unit in _UNITS[i]) for unit in range(27))
+_DIGITS = {1 << d: d + 1 for d in range(9)}
+
+
+class Solver:
+    """
+    Sudoku solver with constraint propagation over bitmasks and backtracking.
+
+    Digits used in every row, column and square are kept as 9-bit masks. Propagation places naked singles, cells with
+    the only candidate, and hidden singles, digits that fit only one cell of a row, column or square. When it gets
+    stuck, the search guesses every candidate of the cell with the fewest candidates.
+    """
+
+    def __init__(self, grid: Sequence, hidden_singles: bool = True):
+        """
+        :param grid: 81 digits row by row as ints or strings, 0, ' ' or '.' for empty cells.
+        :param hidden_singles: use hidden singles in propagation, otherwise only naked singles are placed.
+        """
+
+        self.hidden_singles = hidden_singles
+        self.techniques = collections.Counter()
+        self.guesses = 0
+
+        self._digits = [0] * 81
+        self._used = [0] * 27
+        self._valid = len(grid) == 81
+        for i, value in enumerate(grid):
+            digit = int(value) if value not in (' ', '.') else 0
+            if digit:
+                bit = 1 << digit - 1
+                if any(self._used[unit] & bit for unit in _UNITS[i]):
+                    self._valid = False
+                self._place(self._digits, self._used, i, bit)
+
+    def solutions(self, limit: int = None) -> Iterator[list[int]]:
+        """
+        Yield solutions of the grid as lists of 81 digits.
+
+        :param limit: stop after the given number of solutions.
+        """
+
+        if not self._valid:
+            return
+        for n, solution in enumerate(self._search(list(self._digits), list(self._used)), 1):
+            yield solution
+            if n == limit:
+                return
+
+    def solve(self) -> Optional[list[int]]:
+        """
+        Return the first solution of the grid, or None if it has no solution.
+        """
+
+        return next(self.solutions(1), None)
+
+    def count_solutions(self, limit: int = 2) -> int:
+        """
+        Count solutions of the grid up to the limit, limit of 2 is enough to check that the solution is unique.
+        """
+
+        return sum(1 for _ in self.solutions(limit))
+
+    def _search(self, digits: list, used: list) -> Iterator[list[int]]:
+        if not self._propagate(digits, used):
+            return
+
+        best, best_mask, best_count = -1, 0, 10
+        for i in range(81):
+            if not digits[i]:
+                row, column, square = _UNITS[i]
+                mask = ~(used[row] | used[column] | used[square]) & 0x1ff
+                count = mask.bit_count()
+                if count < best_count:
+                    best, best_mask, best_count = i, mask, count
+                    if count == 2:
+                        break
+        if best < 0:
+            yield digits
+            return
+
+        while best_mask:
+            bit = best_mask & -best_mask
+            best_mask ^= bit
+            self.guesses += 1
+            branch_digits, branch_used = list(digits), list(used)
+            self._place(branch_digits, branch_used, best, bit)
+            yield from self._search(branch_digits, branch_used)
+
+    def _propagate(self, digits: list, used: list) -> bool:
+        # place singles until none is left, returns False when the grid has a contradiction
+        progress = True
+        while progress:
+            progress = False
+            for i in range(81):
+                if digits[i]:
+                    continue
+                row, column, square = _UNITS[i]
+                mask = ~(used[row] | used[column] | used[square]) & 0x1ff
+                if not mask:
+                    return False
+                if not mask & mask - 1:
+                    self._place(digits, used, i, mask)
+                    self.techniques['naked_single'] += 1
+                    progress = True
+
+            if not self.hidden_singles or progress:
+                continue
+
+            for unit, cells in enumerate(_UNIT_CELLS):
+                # digits that are candidates of at least one and of at least two cells of the unit
+                once = twice = 0
+                for i in cells:
+                    if not digits[i]:
+                        row, column, square = _UNITS[i]
+                        mask = ~(used[row] | used[column] | used[square]) & 0x1ff
+                        twice |= once & mask
+                        once |= mask
+                if (once | used[unit]) != 0x1ff:
+                    return False
+
+                singles = once & ~twice
+                while singles:
+                    bit = singles & -singles
+                    singles ^= bit
+                    for i in cells:
+                        if not digits[i]:
+                            row, column, square = _UNITS[i]
+                            if not (used[row] | used[column] | used[square]) & bit:
+                                self._place(digits, used, i, bit)
+                                self.techniques['hidden_single'] += 1
+                                progress = True
+                                break
+        return True
+
+    @staticmethod
+    def _place(digits: list, used: list, i: int, bit: int):
+        digits[i] = _DIGITS[bit]
+        row, column, square = _UNITS[i]
+        used[row] |= bit
+        used[column] |= bit
+        used[square] |= bit
+
+
+def solve(grid: Sequence) -> Optional[list[int]]:
+    """
+    Return solution of the grid as a list of 81 digits, or None if it has no solution.
+    """
+
+    return Solver(grid).solve()
+
+
+def count_solutions(grid: Sequence, limit: int = 2) -> int:
+    """
+    Count solutions of the grid up to the limit.
+    """
+
+    return Solver(grid).count_solutions(limit)
+
+
+def grade(grid: Sequence, expert_guesses: int = 10) -> str:
+    """
+    Grade difficulty of a puzzle by solving techniques it needs, one of DIFFICULTIES. Easy puzzles are solved by naked
+    singles only, medium ones need hidden singles, hard ones need guessing and expert ones need more than the given
+    number of guesses to search the whole tree.
+    """
+
+    solver = Solver(grid, hidden_singles=False)
+    solver.count_solutions(2)
+    if solver.guesses == 0:
+        return 'easy'
+
+    solver = Solver(grid)
+    solver.count_solutions(2)
+    if solver.guesses == 0:
+        return 'medium'
+    return 'hard' if solver.guesses <= expert_guesses else 'expert'
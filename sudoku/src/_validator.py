@@ -0,0 +1,59 @@
+import numpy as np
+
+__all__ = (
+    'validate',
+)
+
+
+def _fold(parts: list) -> tuple[np.ndarray, np.ndarray]:
+    # digits present at least once and at least twice among parts, parts are one-hot bitmasks of cells of units
+    once, twice = parts[0].copy(), np.zeros_like(parts[0])
+    for part in parts[1:]:
+        twice |= once & part
+        once |= part
+    return once, twice
+
+
+def validate(grids: np.ndarray, chunk: int = 65536) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Validate solutions of many grids at once.
+
+    Every cell is turned into a one-hot bitmask of its digit, and masks of cells of every row, column and square are
+    reduced into masks of digits that are present once and more than once. Cells are reduced by folding slices, which
+    is much faster than numpy reductions over short axes.
+
+    :param grids: uint8 numpy array of shape (grids, 9, 9) with digits, 0 for empty cells.
+    :param chunk: number of grids processed at once, bounds the memory of intermediate arrays.
+    :return: bool numpy array of shape (grids,), True for grids that are completely and correctly filled, and bool numpy
+        array of shape (grids, 9, 9), True for cells with a digit that is repeated in its row, column or square.
+    """
+
+    grids = np.asarray(grids)
+    if grids.ndim != 3 or grids.shape[1:] != (9, 9):
+        raise ValueError('grids should have shape (grids, 9, 9)')
+
+    valid = np.zeros(len(grids), dtype=bool)
+    conflicts = np.zeros(grids.shape, dtype=bool)
+    for start in range(0, len(grids), chunk):
+        block = grids[start:start + chunk]
+        n = len(block)
+
+        # bit of every digit, empty cells get bit 0 and values out of range get bit 10, they never make a unit complete
+        bits = np.left_shift(1, np.minimum(block, 10), dtype=np.uint16)
+        squares = bits.reshape(n, 3, 3, 3, 3)
+
+        rows, repeated_rows = _fold([bits[:, :, i] for i in range(9)])
+        columns, repeated_columns = _fold([bits[:, i] for i in range(9)])
+        squares, repeated_squares = _fold([squares[:, :, i, :, j] for i in range(3) for j in range(3)])
+
+        valid[start:start + n] = np.all(rows == 0x3fe, axis=1) & np.all(columns == 0x3fe, axis=1) & \
+            np.all(squares == 0x3fe, axis=(1, 2))
+
+        if np.all(valid[start:start + n]):
+            continue
+        # cells with a digit repeated in their row, column or square
+        repeated = repeated_rows[:, :, np.newaxis] | repeated_columns[:, np.newaxis, :] | \
+            np.repeat(np.repeat(repeated_squares, 3, axis=1), 3, axis=2)
+        conflicts[start:start + n] = (bits & repeated & 0x3fe) != 0
+
+    return valid, conflicts
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import argparse
+import collections
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from _bank import *
+from _engine import *
+from _solver import *
+
+
+def generate(task: tuple) -> tuple[str, bytes]:
+    seed, low, high = task
+    random.seed(seed)
+    grid = Grid(random.uniform(low, high))
+    puzzle = [grid[i] for i in range(9 * 9)]
+    return grade(puzzle), pack(puzzle)
+
+
+def main(args):
+    if args.command == 'generate':
+        os.makedirs(args.path, exist_ok=True)
+        # puzzles are appended, so a bank can be filled by several runs with different seeds
+        files = {difficulty: open(PuzzleBank.filename(args.path, difficulty), 'ab') for difficulty in DIFFICULTIES}
+        counts = collections.Counter()
+
+        start = time.perf_counter()
+        tasks = ((args.seed + i, *args.filling_percent) for i in range(args.count))
+        with multiprocessing.Pool(args.workers) as pool:
+            for difficulty, record in pool.imap_unordered(generate, tasks, chunksize=args.chunksize):
+                files[difficulty].write(record)
+                counts[difficulty] += 1
+        for file in files.values():
+            file.close()
+
+        elapsed = time.perf_counter() - start
+        print(f'{args.count} puzzles in {elapsed:.1f}s, {args.count / elapsed:.1f} puzzles/s, ' +
+              ', '.join(f'{difficulty} {counts[difficulty]}' for difficulty in DIFFICULTIES), file=sys.stderr)
+
+    else:
+        with PuzzleBank(args.path) as bank:
+            if args.index is None:
+                for difficulty in DIFFICULTIES:
+                    print(f'{difficulty:<8}{bank.count(difficulty)}')
+            else:
+                puzzle = bank[args.difficulty, args.index]
+                print('\n'.join(puzzle[i:i + 9] for i in range(0, 9 * 9, 9)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Bank of graded Sudoku puzzles.', add_help=False)
+    parser.add_argument('command', choices=('generate', 'show'),
+                        help='Generate puzzles and append them to the bank, or show a puzzle or number of puzzles.')
+    parser.add_argument('-p', '--path', default='bank', help='Directory of the bank, one file per difficulty.')
+    parser.add_argument('-n', '--count', type=int, default=1000, help='Number of puzzles to generate.')
+    parser.add_argument('-f', '--filling_percent', type=float, nargs=2, default=(0.25, 0.5), metavar=('LOW', 'HIGH'),
+                        help='Range of percentage of filling of generated puzzles.')
+    parser.add_argument('-w', '--workers', type=int, help='Number of processes, defaults to the number of CPUs.')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='Random seed of the first puzzle.')
+    parser.add_argument('--chunksize', type=int, default=16, help='Number of puzzles sent to a process at once.')
+    parser.add_argument('-d', '--difficulty', choices=DIFFICULTIES, default='easy', help='Difficulty of puzzle to show.')
+    parser.add_argument('-i', '--index', type=int, help='Index of puzzle to show.')
+    parser.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS, help='Display detailed help.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main(parse_args())
@@ -66,7 +66,7 @@ class TermGrid(Grid):
 
     def refresh(self, force=False):
         is_resolved = self.is_resolved()
-        mistakes = tuple(self.mistakes())
+        mistakes = self.mistakes()
         for y, x in map(lambda i: divmod(i, 9), range(9 * 9)):
             attr = curses.A_NORMAL
             if (y, x) in self.unmodified: